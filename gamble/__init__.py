@@ -4,6 +4,7 @@ gamble module
 
 from gamble.models import (
     # cards
+    CARDS,
     BlackJackDeck,
     Card,
     Deck,
@@ -14,8 +15,10 @@ from gamble.models import (
     Suit,
     Value,
     # dice
+    AliasTable,
     Die,
     Dice,
+    Distribution,
     RiggedDie,
     # golf
     Course,
@@ -27,6 +30,7 @@ from gamble.models import (
 
 __all__ = [
     # cards
+    "CARDS",
     "BlackJackDeck",
     "Card",
     "Deck",
@@ -37,8 +41,10 @@ __all__ = [
     "Suit",
     "Value",
     # dice
+    "AliasTable",
     "Die",
     "Dice",
+    "Distribution",
     "RiggedDie",
     # golf
     "Course",
@@ -24,3 +24,11 @@ class GambleException(Exception):  # pragma: no cover
 
 class InvalidCard(GambleException):
     """the given string is not a valid card"""
+
+
+class InvalidHand(GambleException):
+    """the given cards are not a valid deal"""
+
+
+class InvalidRange(GambleException):
+    """the given string is not a valid hand range"""
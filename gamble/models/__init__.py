@@ -4,6 +4,10 @@ models submodule for gamble
 
 # ruff: noqa: F403
 
+from gamble.models.distribution import *
 from gamble.models.dice import *
 from gamble.models.cards import *
 from gamble.models.golf import *
+from gamble.models.poker import *
+from gamble.models.compact import *
+from gamble.models.blackjack import *
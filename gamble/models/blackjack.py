@@ -0,0 +1,953 @@
+"""
+blackjack rules, strategy and a monte carlo engine over compact shoes
+"""
+
+import functools
+import math
+import os
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from gamble.errors import GambleException
+from gamble.models.cards import CardCounts
+from gamble.models.compact import CompactShoe
+from gamble.models.evaluator import HasCode
+from gamble.rng import SeedSequence
+
+# blackjack value of each card code, aces are 1 and face cards are 10
+CARD_VALUES = tuple(min(code % 13 + 1, 10) for code in range(52))
+# hi-lo count tag of each card code
+HI_LO = tuple(1 if 2 <= x <= 6 else -1 if x in (1, 10) else 0 for x in CARD_VALUES)
+# strategy table columns, by dealer up card: 2 3 4 5 6 7 8 9 10 A
+UP_CARDS = (2, 3, 4, 5, 6, 7, 8, 9, 10, 1)
+# dealer final totals, in the order of dealer_outcomes
+DEALER_TOTALS = (17, 18, 19, 20, 21, 22)
+BUST = 22
+# the max number of entries in each of the exact calculator caches
+CACHE_SIZE = 1 << 16
+
+# actions: H hit, S stand, D double (else hit), Ds double (else stand), P split,
+# R surrender (else hit), Rs surrender (else stand), - don't split
+HARD = {
+    9: "H D D D D H H H H H",
+    10: "D D D D D D D D H H",
+    11: "D D D D D D D D D D",
+    12: "H H S S S H H H H H",
+    13: "S S S S S H H H H H",
+    14: "S S S S S H H H H H",
+    15: "S S S S S H H H R R",
+    16: "S S S S S H H R R R",
+    17: "S S S S S S S S S Rs",
+}
+SOFT = {
+    13: "H H H D D H H H H H",
+    14: "H H H D D H H H H H",
+    15: "H H D D D H H H H H",
+    16: "H H D D D H H H H H",
+    17: "H D D D D H H H H H",
+    18: "Ds Ds Ds Ds Ds S S H H H",
+    19: "S S S S Ds S S S S S",
+}
+PAIRS = {
+    1: "P P P P P P P P P P",
+    2: "P P P P P P - - - -",
+    3: "P P P P P P - - - -",
+    4: "- - - P P - - - - -",
+    6: "P P P P P - - - - -",
+    7: "P P P P P P - - - -",
+    8: "P P P P P P P P P P",
+    9: "P P P P P - P P - -",
+}
+# hi-lo index plays: (table, total, up card) -> (true count, action at or above, action below)
+HI_LO_DEVIATIONS = {
+    ("hard", 16, 10): (0, "S", "R"),
+    ("hard", 15, 10): (4, "S", "R"),
+    ("hard", 16, 9): (5, "S", "R"),
+    ("hard", 13, 2): (-1, "S", "H"),
+    ("hard", 13, 3): (-2, "S", "H"),
+    ("hard", 12, 2): (3, "S", "H"),
+    ("hard", 12, 3): (2, "S", "H"),
+    ("hard", 12, 4): (0, "S", "H"),
+    ("hard", 12, 5): (-2, "S", "H"),
+    ("hard", 12, 6): (-1, "S", "H"),
+    ("hard", 10, 10): (4, "D", "H"),
+    ("hard", 10, 1): (3, "D", "H"),
+    ("hard", 9, 2): (1, "D", "H"),
+    ("hard", 9, 7): (3, "D", "H"),
+    ("pair", 10, 5): (5, "P", "-"),
+    ("pair", 10, 6): (4, "P", "-"),
+}
+
+
+def hand_value(values: list[int]) -> tuple[int, bool]:
+    """
+    the best total of a blackjack hand
+
+    Args:
+        values: the blackjack values of the cards, aces as 1
+
+    Returns:
+        a tuple of the total and if it is soft (an ace counted as 11)
+    """
+    total = sum(values)
+    if 1 in values and total <= 11:
+        return total + 10, True
+    return total, False
+
+
+@dataclass(frozen=True)
+class Rules:
+    """
+    the table rules of a blackjack game
+
+    Args:
+        num_decks: the number of decks in the shoe
+        hit_soft_17: if the dealer hits a soft 17 (h17), or stands on it (s17)
+        double_after_split: if doubling is allowed after a split
+        blackjack_payout: the payout of a natural, 1.5 for 3:2 or 1.2 for 6:5
+        penetration: the share of the shoe dealt before the cut card
+        max_splits: the max number of splits per round
+        resplit_aces: if aces can be split again
+        hit_split_aces: if split aces can take more than one card
+        surrender: if late surrender is allowed
+        dealer_peeks: if the dealer checks for blackjack under an ace or ten
+    """
+
+    num_decks: int = 6
+    hit_soft_17: bool = True
+    double_after_split: bool = True
+    blackjack_payout: float = 1.5
+    penetration: float = 0.75
+    max_splits: int = 3
+    resplit_aces: bool = False
+    hit_split_aces: bool = False
+    surrender: bool = False
+    dealer_peeks: bool = True
+
+
+@dataclass
+class Strategy:
+    """
+    a blackjack strategy table, with optional true count index plays
+
+    the tables are keyed by total (or by pair card value) and hold one action per
+    dealer up card, in UP_CARDS order. totals missing from a table hit below 17
+    and stand on 17 or more
+
+    Args:
+        hard: actions for hard totals
+        soft: actions for soft totals
+        pairs: split decisions for pairs
+        deviations: (table, total, up card) -> (true count, action at or above, action below)
+        insurance_index: the true count to take insurance at, or None to never take it
+    """
+
+    hard: dict[int, str] = field(default_factory=lambda: dict(HARD))
+    soft: dict[int, str] = field(default_factory=lambda: dict(SOFT))
+    pairs: dict[int, str] = field(default_factory=lambda: dict(PAIRS))
+    deviations: dict[tuple[str, int, int], tuple[float, str, str]] = field(default_factory=dict)
+    insurance_index: float | None = None
+
+    def __post_init__(self) -> None:
+        """
+        split the table rows into a dict per total of up card -> action
+        """
+        self._tables = {
+            name: {
+                total: dict(zip(UP_CARDS, row.split(), strict=True)) for total, row in table.items()
+            }
+            for name, table in (("hard", self.hard), ("soft", self.soft), ("pair", self.pairs))
+        }
+
+    @classmethod
+    def basic(cls) -> "Strategy":
+        """
+        multi-deck basic strategy, for h17 with double after split and late surrender
+
+        Returns:
+            the basic strategy, without index plays
+        """
+        return cls()
+
+    @classmethod
+    def hi_lo(cls, insurance_index: float = 3) -> "Strategy":
+        """
+        basic strategy plus the hi-lo index plays
+
+        Args:
+            insurance_index: the true count to take insurance at
+
+        Returns:
+            the counting strategy
+        """
+        return cls(deviations=dict(HI_LO_DEVIATIONS), insurance_index=insurance_index)
+
+    def lookup(self, table: str, total: int, up: int, true_count: float) -> str:
+        """
+        the table action for a hand, after any index play
+
+        Args:
+            table: "hard", "soft" or "pair"
+            total: the hand total, or the pair card value
+            up: the dealer up card value, aces as 1
+            true_count: the current true count
+
+        Returns:
+            the action token from the table
+        """
+        deviation = self.deviations.get((table, total, up))
+        if deviation:
+            index, above, below = deviation
+            return above if true_count >= index else below
+        row = self._tables[table].get(total)
+        if row:
+            return row[up]
+        if table == "pair":
+            return "-"
+        return "H" if total < 17 else "S"
+
+    def action(  # noqa: PLR0913, PLR0917
+        self,
+        values: list[int],
+        up: int,
+        true_count: float = 0,
+        can_double: bool = True,
+        can_split: bool = True,
+        can_surrender: bool = False,
+    ) -> str:
+        """
+        decide how to play a hand
+
+        Args:
+            values: the blackjack values of the cards in the hand, aces as 1
+            up: the dealer up card value, aces as 1
+            true_count: the current true count
+            can_double: if the hand may double
+            can_split: if the hand may split, when it is a pair
+            can_surrender: if the hand may surrender
+
+        Returns:
+            one of H (hit), S (stand), D (double), P (split) or R (surrender)
+        """
+        pair = len(values) == 2 and values[0] == values[1]
+        if pair and can_split and self.lookup("pair", values[0], up, true_count) == "P":
+            return "P"
+        total, soft = hand_value(values)
+        token = self.lookup("soft" if soft else "hard", total, up, true_count)
+        if token in ("D", "Ds"):
+            return "D" if can_double else {"D": "H", "Ds": "S"}[token]
+        if token in ("R", "Rs"):
+            return "R" if can_surrender else {"R": "H", "Rs": "S"}[token]
+        return token
+
+
+@dataclass
+class BetSpread:
+    """
+    a betting policy that raises the bet with the true count
+
+    Args:
+        spread: min true count -> bet, in units
+        min_bet: the bet below every count in the spread, in units
+    """
+
+    spread: dict[float, float] = field(default_factory=dict)
+    min_bet: float = 1.0
+
+    def bet(self, true_count: float) -> float:
+        """
+        the bet for a true count
+
+        Args:
+            true_count: the current true count
+
+        Returns:
+            the bet, in units
+        """
+        bet = self.min_bet
+        for count, units in sorted(self.spread.items()):
+            if true_count >= count:
+                bet = units
+        return bet
+
+
+class HiLo:
+    """
+    a hi-lo running count over the cards seen from a shoe
+    """
+
+    def __init__(self) -> None:
+        self.running = 0
+
+    def __str__(self) -> str:
+        """
+        dunder str method
+
+        Returns:
+            the string representation of this count
+        """
+        return f"<HiLo {self.running}>"
+
+    def see(self, code: int) -> None:
+        """
+        count a card that has been seen
+
+        Args:
+            code: the card code
+        """
+        self.running += HI_LO[code]
+
+    def true_count(self, cards_left: int) -> float:
+        """
+        the running count per deck left in the shoe
+
+        Args:
+            cards_left: the number of cards left in the shoe
+
+        Returns:
+            the true count
+        """
+        return self.running / max(cards_left / 52, 0.5)
+
+    def reset(self) -> None:
+        """
+        start a new count, after a shuffle
+        """
+        self.running = 0
+
+
+def settle(values: list[int], stake: float, dealer: int) -> float:
+    """
+    the net win of a standing hand against the dealer's final total
+
+    Args:
+        values: the blackjack values of the cards in the hand
+        stake: the amount bet on the hand
+        dealer: the dealer's final total
+
+    Returns:
+        the net win of the hand
+    """
+    total, _ = hand_value(values)
+    if total > 21:
+        return -stake
+    if dealer > 21 or total > dealer:
+        return stake
+    if total < dealer:
+        return -stake
+    return 0.0
+
+
+def play_round(  # noqa: PLR0912, PLR0915
+    shoe: CompactShoe, rules: Rules, strategy: Strategy, spread: BetSpread, count: HiLo
+) -> tuple[float, float]:
+    """
+    play one round of heads up blackjack
+
+    the shoe is shuffled at the cut card, and every card is counted as it is seen
+
+    Args:
+        shoe: the shoe to deal from
+        rules: the table rules
+        strategy: how the player plays
+        spread: how the player bets
+        count: the running count, updated with every card seen
+
+    Returns:
+        a tuple of the total amount wagered and the net win, in units
+    """
+    if shoe.needs_shuffle or shoe.cards_left < 30:
+        shoe.shuffle()
+        count.reset()
+
+    def draw() -> int:
+        """
+        draw a card the table can see, and count it
+
+        Returns:
+            the blackjack value of the card drawn
+        """
+        code = shoe.draw_code()
+        count.see(code)
+        return CARD_VALUES[code]
+
+    bet = spread.bet(count.true_count(shoe.cards_left))
+    player = [draw(), draw()]
+    up = draw()
+    hole_code = shoe.draw_code()
+    dealer = [up, CARD_VALUES[hole_code]]
+    dealer_blackjack = hand_value(dealer)[0] == 21
+    player_blackjack = hand_value(player)[0] == 21
+    wagered, net = bet, 0.0
+    index = strategy.insurance_index
+    if up == 1 and index is not None and count.true_count(shoe.cards_left) >= index:
+        wagered += bet / 2
+        net += bet if dealer_blackjack else -bet / 2
+    if dealer_blackjack and (rules.dealer_peeks or player_blackjack):
+        count.see(hole_code)
+        return wagered, net - (0 if player_blackjack else bet)
+    if player_blackjack:
+        count.see(hole_code)
+        return wagered, net + bet * rules.blackjack_payout
+
+    hands: list[tuple[list[int], float]] = []
+    pending: list[tuple[list[int], bool]] = [(player, False)]
+    splits = 0
+    while pending:
+        cards, split = pending.pop(0)
+        stake = bet
+        if split:
+            cards.append(draw())
+        while True:
+            total, _ = hand_value(cards)
+            if total >= 21:
+                break
+            first = len(cards) == 2
+            split_aces = split and cards[0] == 1
+            can_split = (
+                first
+                and cards[0] == cards[1]
+                and splits < rules.max_splits
+                and (not split_aces or rules.resplit_aces)
+            )
+            if split_aces and not rules.hit_split_aces and not can_split:
+                break
+            action = strategy.action(
+                cards,
+                up,
+                count.true_count(shoe.cards_left),
+                can_double=first and (not split or rules.double_after_split) and not split_aces,
+                can_split=can_split,
+                can_surrender=first and not split and rules.surrender,
+            )
+            if split_aces and not rules.hit_split_aces and action != "P":
+                break
+            if action == "P":
+                splits += 1
+                wagered += bet
+                pending.append(([cards.pop()], True))
+                split = True
+                cards.append(draw())
+            elif action == "D":
+                wagered += bet
+                stake = 2 * bet
+                cards.append(draw())
+                break
+            elif action == "R":
+                stake = 0
+                net -= bet / 2
+                break
+            elif action == "H":
+                cards.append(draw())
+            else:
+                break
+        if stake:
+            hands.append((cards, stake))
+
+    count.see(hole_code)
+    live = [x for x in hands if hand_value(x[0])[0] <= 21]
+    if dealer_blackjack:
+        return wagered, net - sum(stake for _, stake in hands)
+    total, soft = hand_value(dealer)
+    while live and (total < 17 or (total == 17 and soft and rules.hit_soft_17)):
+        dealer.append(draw())
+        total, soft = hand_value(dealer)
+    return wagered, net + sum(settle(cards, stake, total) for cards, stake in hands)
+
+
+@dataclass
+class BlackjackResult:
+    """
+    the merged result of a blackjack simulation, in betting units
+
+    Args:
+        rounds: the number of rounds played
+        wagered: the total amount wagered
+        total: the total net win
+        squares: the sum of the squared net win of each round
+    """
+
+    rounds: int = 0
+    wagered: float = 0.0
+    total: float = 0.0
+    squares: float = 0.0
+
+    def __str__(self) -> str:
+        """
+        dunder str method
+
+        Returns:
+            the string representation of this result
+        """
+        return f"<BlackjackResult[{self.rounds}] ev={self.ev:.4f} edge={self.edge:.4%}>"
+
+    def record(self, wagered: float, net: float) -> None:
+        """
+        record one round
+
+        Args:
+            wagered: the amount wagered in the round
+            net: the net win of the round
+        """
+        self.rounds += 1
+        self.wagered += wagered
+        self.total += net
+        self.squares += net * net
+
+    def merge(self, other: "BlackjackResult") -> "BlackjackResult":
+        """
+        merge another result into this one
+
+        Args:
+            other: the result to merge in
+
+        Returns:
+            this result, for chaining
+        """
+        self.rounds += other.rounds
+        self.wagered += other.wagered
+        self.total += other.total
+        self.squares += other.squares
+        return self
+
+    @property
+    def ev(self) -> float:
+        """
+        the expected net win per round
+
+        Returns:
+            the mean net win, in units
+        """
+        return self.total / self.rounds if self.rounds else 0.0
+
+    @property
+    def edge(self) -> float:
+        """
+        the player's edge, the net win per unit wagered
+
+        Returns:
+            the edge, negative when the house wins
+        """
+        return self.total / self.wagered if self.wagered else 0.0
+
+    @property
+    def variance(self) -> float:
+        """
+        the variance of the net win of a round
+
+        Returns:
+            the variance, in squared units
+        """
+        if not self.rounds:
+            return 0.0
+        return self.squares / self.rounds - self.ev**2
+
+    @property
+    def stddev(self) -> float:
+        """
+        the standard deviation of the net win of a round
+
+        Returns:
+            the standard deviation, in units
+        """
+        return math.sqrt(self.variance)
+
+    def risk_of_ruin(self, bankroll: float) -> float:
+        """
+        the chance of ever losing a bankroll, playing forever at this ev and variance
+
+        uses the diffusion approximation exp(-2 * ev * bankroll / variance)
+
+        Args:
+            bankroll: the bankroll, in units
+
+        Returns:
+            the risk of ruin, 1 if the ev is not positive
+        """
+        if self.ev <= 0 or not self.variance:
+            return 1.0 if self.ev <= 0 else 0.0
+        return min(math.exp(-2 * self.ev * bankroll / self.variance), 1.0)
+
+
+def run_shard(
+    rounds: int,
+    rules: Rules,
+    strategy: Strategy,
+    spread: BetSpread,
+    seed: SeedSequence,
+) -> BlackjackResult:
+    """
+    play one shard of a simulation, with its own shoe and generator
+
+    Args:
+        rounds: the number of rounds to play
+        rules: the table rules
+        strategy: how the player plays
+        spread: how the player bets
+        seed: the seed sequence for this shard's generator
+
+    Returns:
+        the result for this shard
+    """
+    shoe = CompactShoe(rules.num_decks, rules.penetration, rng=seed.rng())
+    count = HiLo()
+    result = BlackjackResult()
+    for _ in range(rounds):
+        result.record(*play_round(shoe, rules, strategy, spread, count))
+    return result
+
+
+def simulate(  # noqa: PLR0913, PLR0917
+    rounds: int,
+    rules: Rules | None = None,
+    strategy: Strategy | None = None,
+    spread: BetSpread | None = None,
+    seed: int | None = None,
+    workers: int | None = None,
+    shards: int | None = None,
+) -> BlackjackResult:
+    """
+    simulate heads up blackjack, sharding the rounds across a process pool
+
+    every shard plays its own shoe with a generator spawned from the root seed,
+    so a run with the same seed and number of shards is reproducible
+
+    Args:
+        rounds: the total number of rounds to play
+        rules: the table rules, defaults to Rules()
+        strategy: how the player plays, defaults to basic strategy
+        spread: how the player bets, defaults to flat betting one unit
+        seed: the root seed, or None for a random one
+        workers: the number of processes to use, defaults to the cpu count
+        shards: the number of independent shards, defaults to the number of workers
+
+    Returns:
+        the merged result of every round
+    """
+    if rounds < 1:
+        raise GambleException("a simulation needs at least one round")
+    rules = rules or Rules()
+    strategy = strategy or Strategy.basic()
+    spread = spread or BetSpread()
+    workers = workers or os.cpu_count() or 1
+    shards = min(shards or workers, rounds)
+    seeds = SeedSequence(seed).spawn(shards)
+    jobs = [
+        (rounds // shards + (i < rounds % shards), rules, strategy, spread, shard_seed)
+        for i, shard_seed in enumerate(seeds)
+    ]
+    result = BlackjackResult()
+    if workers == 1:
+        for job in jobs:
+            result.merge(run_shard(*job))
+        return result
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for shard in executor.map(run_shard, *zip(*jobs, strict=True)):
+            result.merge(shard)
+    return result
+
+
+def composition_of(cards: CardCounts | Iterable[int | HasCode]) -> tuple[int, ...]:
+    """
+    the composition of a set of cards, by blackjack value
+
+    Args:
+        cards: a Deck or CompactShoe (its remaining cards), or cards or card codes
+
+    Returns:
+        a tuple of the number of cards of each value, aces first and tens last
+    """
+    composition = [0] * 10
+    if isinstance(cards, CardCounts):
+        for code, count in enumerate(cards.counts):
+            composition[CARD_VALUES[code] - 1] += count
+    else:
+        for card in cards:
+            composition[CARD_VALUES[card if isinstance(card, int) else card.code] - 1] += 1
+    return tuple(composition)
+
+
+def remove(composition: tuple[int, ...], value: int) -> tuple[int, ...]:
+    """
+    a composition with one card taken out
+
+    Args:
+        composition: the composition, by blackjack value
+        value: the blackjack value of the card to take out, aces as 1
+
+    Returns:
+        the new composition
+    """
+    return (*composition[: value - 1], composition[value - 1] - 1, *composition[value:])
+
+
+def peeked(up: int, rules: Rules) -> int:
+    """
+    the hole card value ruled out when the dealer peeked and has no blackjack
+
+    Args:
+        up: the dealer up card value, aces as 1
+        rules: the table rules
+
+    Returns:
+        the value the hole card can't be, or 0
+    """
+    if not rules.dealer_peeks:
+        return 0
+    return {1: 10, 10: 1}.get(up, 0)
+
+
+def dealer_final(hard: int, ace: bool, hit_soft_17: bool) -> int:
+    """
+    the final total of a dealer hand, if the dealer is done drawing
+
+    Args:
+        hard: the dealer's total, counting aces as 1
+        ace: if the dealer holds an ace
+        hit_soft_17: if the dealer hits a soft 17
+
+    Returns:
+        the final total, BUST for a bust, or 0 if the dealer has to draw
+    """
+    soft = ace and hard <= 11
+    total = hard + 10 if soft else hard
+    if total > 21:
+        return BUST
+    if total >= 17 and not (total == 17 and soft and hit_soft_17):
+        return total
+    return 0
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def dealer_outcomes(
+    composition: tuple[int, ...], hard: int, ace: bool, hit_soft_17: bool, exclude: int = 0
+) -> tuple[float, ...]:
+    """
+    the chance of each final dealer total, drawing from a composition
+
+    only hands the dealer has to draw to are cached, finished hands are resolved
+    by the caller, so the bounded cache is spent on states that recurse
+
+    Args:
+        composition: the unseen cards, by blackjack value
+        hard: the dealer's total so far, counting aces as 1
+        ace: if the dealer holds an ace
+        hit_soft_17: if the dealer hits a soft 17
+        exclude: a value the next card can't be (the peeked hole card), or 0
+
+    Returns:
+        the chance of finishing on each of DEALER_TOTALS, the last being a bust
+    """
+    outcomes = [0.0] * 6
+    final = dealer_final(hard, ace, hit_soft_17)
+    if final:
+        outcomes[final - 17] = 1.0
+        return tuple(outcomes)
+    weights = [0 if value == exclude else x for value, x in enumerate(composition, 1)]
+    cards = sum(weights)
+    if not cards:
+        total = hard + 10 if ace and hard <= 11 else hard
+        if total >= 17:
+            outcomes[total - 17] = 1.0
+        return tuple(outcomes)
+    for value, count in enumerate(weights, 1):
+        if not count:
+            continue
+        chance = count / cards
+        new_hard, new_ace = hard + value, ace or value == 1
+        final = dealer_final(new_hard, new_ace, hit_soft_17)
+        if final:
+            outcomes[final - 17] += chance
+            continue
+        after = dealer_outcomes(remove(composition, value), new_hard, new_ace, hit_soft_17)
+        for i, x in enumerate(after):
+            outcomes[i] += chance * x
+    return tuple(outcomes)
+
+
+def dealer_probabilities(
+    composition: Sequence[int], up: int, rules: Rules | None = None
+) -> dict[int, float]:
+    """
+    the exact chance of each final dealer total for an up card and a shoe composition
+
+    with a peeking dealer the chances are conditioned on the dealer not having
+    blackjack, as they are whenever the player gets to act
+
+    Args:
+        composition: the unseen cards (without the up card), by blackjack value
+        up: the dealer up card value, aces as 1
+        rules: the table rules, defaults to Rules()
+
+    Returns:
+        a dict of final total (17 to 21, or BUST) -> chance
+    """
+    rules = rules or Rules()
+    outcomes = dealer_outcomes(
+        tuple(composition), up, up == 1, rules.hit_soft_17, peeked(up, rules)
+    )
+    return dict(zip(DEALER_TOTALS, outcomes, strict=True))
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def stand_ev(composition: tuple[int, ...], total: int, up: int, rules: Rules) -> float:
+    """
+    the exact ev of standing on a total
+
+    Args:
+        composition: the unseen cards, by blackjack value
+        total: the player's total
+        up: the dealer up card value, aces as 1
+        rules: the table rules
+
+    Returns:
+        the ev of standing, per unit bet
+    """
+    if total > 21:
+        return -1.0
+    outcomes = dealer_outcomes(composition, up, up == 1, rules.hit_soft_17, peeked(up, rules))
+    ev = outcomes[-1]
+    for dealer, chance in zip(DEALER_TOTALS[:-1], outcomes, strict=False):
+        if total > dealer:
+            ev += chance
+        elif total < dealer:
+            ev -= chance
+    return ev
+
+
+def draws(composition: tuple[int, ...]) -> list[tuple[int, float, tuple[int, ...]]]:
+    """
+    every card that can be drawn from a composition
+
+    Args:
+        composition: the unseen cards, by blackjack value
+
+    Returns:
+        a list of (value, chance, composition after the draw)
+    """
+    cards = sum(composition)
+    return [
+        (value, count / cards, remove(composition, value))
+        for value, count in enumerate(composition, 1)
+        if count
+    ]
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def hit_ev(composition: tuple[int, ...], hard: int, ace: bool, up: int, rules: Rules) -> float:
+    """
+    the exact ev of hitting once, then hitting or standing, whichever is better
+
+    Args:
+        composition: the unseen cards, by blackjack value
+        hard: the player's total so far, counting aces as 1
+        ace: if the player holds an ace
+        up: the dealer up card value, aces as 1
+        rules: the table rules
+
+    Returns:
+        the ev of hitting, per unit bet
+    """
+    ev = 0.0
+    for value, chance, after in draws(composition):
+        new_hard, new_ace = hard + value, ace or value == 1
+        total = new_hard + 10 if new_ace and new_hard <= 11 else new_hard
+        if total > 21:
+            ev -= chance
+            continue
+        best = stand_ev(after, total, up, rules)
+        if total < 21:
+            best = max(best, hit_ev(after, new_hard, new_ace, up, rules))
+        ev += chance * best
+    return ev
+
+
+def double_ev(composition: tuple[int, ...], hard: int, ace: bool, up: int, rules: Rules) -> float:
+    """
+    the exact ev of doubling, taking one card for twice the bet
+
+    Args:
+        composition: the unseen cards, by blackjack value
+        hard: the player's total so far, counting aces as 1
+        ace: if the player holds an ace
+        up: the dealer up card value, aces as 1
+        rules: the table rules
+
+    Returns:
+        the ev of doubling, per unit of the original bet
+    """
+    ev = 0.0
+    for value, chance, after in draws(composition):
+        new_hard, new_ace = hard + value, ace or value == 1
+        total = new_hard + 10 if new_ace and new_hard <= 11 else new_hard
+        ev += chance * stand_ev(after, total, up, rules)
+    return 2 * ev
+
+
+def split_ev(composition: tuple[int, ...], value: int, up: int, rules: Rules) -> float:
+    """
+    the ev of splitting a pair, without resplits
+
+    each hand is played as the first of the two, drawing from the composition
+    without the other hand's cards, so the interaction between the hands is
+    ignored (the usual approximation, exact splits are far more expensive)
+
+    Args:
+        composition: the unseen cards (without either card of the pair), by blackjack value
+        value: the blackjack value of the pair card, aces as 1
+        up: the dealer up card value, aces as 1
+        rules: the table rules
+
+    Returns:
+        the ev of splitting, per unit of the original bet
+    """
+    ev = 0.0
+    for drawn, chance, after in draws(composition):
+        hard, ace = value + drawn, value == 1 or drawn == 1
+        total = hard + 10 if ace and hard <= 11 else hard
+        best = stand_ev(after, total, up, rules)
+        if value != 1 or rules.hit_split_aces:
+            if total < 21:
+                best = max(best, hit_ev(after, hard, ace, up, rules))
+            if rules.double_after_split:
+                best = max(best, double_ev(after, hard, ace, up, rules))
+        ev += chance * best
+    return 2 * ev
+
+
+def action_ev(
+    composition: Sequence[int], player: Sequence[int], up: int, rules: Rules | None = None
+) -> dict[str, float]:
+    """
+    the exact ev of every legal action for a hand, from the composition of the shoe
+
+    results are memoized on the composition and hand state in bounded lru caches,
+    so repeated queries from a counting tool are fast
+
+    Args:
+        composition: the unseen cards (without the player's cards or the up card),
+            by blackjack value, see composition_of
+        player: the blackjack values of the player's cards, aces as 1
+        up: the dealer up card value, aces as 1
+        rules: the table rules, defaults to Rules()
+
+    Returns:
+        a dict of action (stand, hit, double, split, surrender) -> ev per unit bet
+    """
+    rules = rules or Rules()
+    shoe = tuple(composition)
+    hard, ace = sum(player), 1 in player
+    total, _ = hand_value(list(player))
+    first = len(player) == 2
+    if first and total == 21:
+        return {"stand": rules.blackjack_payout}
+    evs = {"stand": stand_ev(shoe, total, up, rules)}
+    if total < 21:
+        evs["hit"] = hit_ev(shoe, hard, ace, up, rules)
+    if first:
+        evs["double"] = double_ev(shoe, hard, ace, up, rules)
+        if player[0] == player[1]:
+            evs["split"] = split_ev(shoe, player[0], up, rules)
+        if rules.surrender:
+            evs["surrender"] = -0.5
+    return evs
@@ -2,11 +2,17 @@
 deck of cards submodule
 """
 
+import copy
 import random
+from array import array
 from collections import Counter
+from collections.abc import Iterable
 from dataclasses import dataclass
+from operator import attrgetter
 from typing import Any
-from gamble.errors import InvalidCard
+from gamble.errors import GambleException, InvalidCard
+from gamble.models.evaluator import category, evaluate
+from gamble.rng import default_rng
 
 
 @dataclass
@@ -156,9 +162,34 @@ class Card:
             """
             return {x.char: x for x in cls.all()}
 
+    __slots__ = ("code", "suit", "value")
+    code: int
+    suit: Suit
+    value: Value
+
     def __init__(self, value: Value = Values.ACE, suit: Suit = Suits.SPADES) -> None:
-        self.value = value
-        self.suit = suit
+        object.__setattr__(self, "value", value)
+        object.__setattr__(self, "suit", suit)
+        object.__setattr__(self, "code", suit.value * 13 + value.value - 1)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """
+        cards are immutable, so that they can be shared and hashed
+
+        Args:
+            name: the name of the attribute
+            value: the value to set
+        """
+        raise AttributeError(f"cannot set {name}, cards are immutable")
+
+    def __reduce__(self) -> tuple[type["Card"], tuple[Value, Suit]]:
+        """
+        pickle cards through the constructor, since they are immutable
+
+        Returns:
+            the class and the arguments to rebuild this card
+        """
+        return self.__class__, (self.value, self.suit)
 
     @classmethod
     def get(cls, text: str) -> "Card":
@@ -173,14 +204,29 @@ class Card:
         """
         if not len(text) == 2:
             raise InvalidCard("Too many characters for a card!")
-        vals = cls.Values.dict()
-        suits = cls.Suits.dict()
-        value_char, suit_char = list(text.upper())
-        if value_char not in vals:
+        text = text.upper()
+        card = CARDS_BY_TEXT.get(text)
+        if card and cls is Card:
+            return card
+        value_char, suit_char = list(text)
+        if value_char not in VALUES:
             raise InvalidCard("Invalid value for card!")
-        if suit_char not in suits:
+        if suit_char not in SUITS:
             raise InvalidCard("Invalid suit for card!")
-        return cls(value=vals[value_char], suit=suits[suit_char])
+        return cls(value=VALUES[value_char], suit=SUITS[suit_char])
+
+    @classmethod
+    def from_code(cls, code: int) -> "Card":
+        """
+        get one of the 52 shared standard cards by its code
+
+        Args:
+            code: the card code, suit.value * 13 + value.value - 1
+
+        Returns:
+            the shared card for this code
+        """
+        return CARDS[code]
 
     @property
     def color(self) -> int:
@@ -310,9 +356,55 @@ class Card:
         Returns:
             true if this card is the same as other
         """
+        if self is other:
+            return True
         if not isinstance(other, Card):
             return False
-        return self.suit == other.suit and self.value == other.value
+        return self.code == other.code and self.suit == other.suit and self.value == other.value
+
+    def __hash__(self) -> int:
+        """
+        hash dunder method
+
+        Returns:
+            a hash of this card, equal cards share the same code
+        """
+        return hash(self.code)
+
+
+VALUES = Card.Values.dict()
+SUITS = Card.Suits.dict()
+# the 52 shared, immutable standard cards, indexed by their code
+CARDS = tuple(
+    Card(value=value, suit=suit) for suit in Card.Suits.all() for value in Card.Values.all()
+)
+CARDS_BY_TEXT = {f"{x.value.char}{x.suit.char}": x for x in CARDS}
+
+
+def cards_to_codes(cards: Iterable[Card]) -> array:
+    """
+    pack cards into a compact array of card codes
+
+    Args:
+        cards: the cards to pack
+
+    Returns:
+        an unsigned byte array of the card codes
+    """
+    return array("B", map(attrgetter("code"), cards))
+
+
+def codes_to_cards(codes: Iterable[int]) -> list[Card]:
+    """
+    unpack card codes into the shared standard cards
+
+    Args:
+        codes: card codes, like an array or bytes from cards_to_codes
+
+    Returns:
+        a list of cards
+    """
+    return list(map(CARDS.__getitem__, codes))
 
 
 class Hand:
@@ -339,12 +431,32 @@ class Hand:
         PAIR = Rank(value=1, name="pair")
         HIGH_CARD = Rank(value=0, name="high card")
 
+        @classmethod
+        def all(cls) -> list[Rank]:
+            """
+            get all ranks in this enum
+
+            Returns:
+                a list of the rank objects, from lowest to highest
+            """
+            return sorted(
+                [
+                    cls.__dict__[x]
+                    for x in dir(cls)
+                    if not x.startswith("_") and isinstance(cls.__dict__[x], Rank)
+                ],
+                key=lambda x: x.value,
+            )
+
+    __slots__ = ("_cards", "_key", "_suit_counts", "_value_counts", "cards", "size")
+
     def __init__(self, cards: list[Card]) -> None:
         self._cards = cards
         self.cards = sorted(self._cards)
         self.size = len(self.cards)
-        self.value_counts = Counter([x.value.value for x in self.cards])
-        self.suit_counts = Counter([x.suit.value for x in self.cards])
+        self._value_counts: Counter | None = None
+        self._suit_counts: Counter | None = None
+        self._key: tuple[int, ...] | None = None
 
     def __lt__(self, other: "Hand") -> bool:
         """
@@ -356,7 +468,19 @@ class Hand:
         Returns:
             true if this hand is less than the other
         """
-        return self.rank.value < other.rank.value
+        return self.key < other.key
+
+    def __le__(self, other: "Hand") -> bool:
+        """
+        less than or equal dunder method
+
+        Args:
+            other: another hand to compare against
+
+        Returns:
+            true if this hand is less than or equal to the other
+        """
+        return self.key <= other.key
 
     def __gt__(self, other: "Hand") -> bool:
         """
@@ -368,7 +492,42 @@ class Hand:
         Returns:
             true if this hand is greater than the other
         """
-        return self.rank.value > other.rank.value
+        return self.key > other.key
+
+    def __ge__(self, other: "Hand") -> bool:
+        """
+        greater than or equal dunder method
+
+        Args:
+            other: another hand to compare against
+
+        Returns:
+            true if this hand is greater than or equal to the other
+        """
+        return self.key >= other.key
+
+    def __eq__(self, other: object) -> bool:
+        """
+        equality dunder method, hands are equal if they tie at showdown
+
+        Args:
+            other: another hand to compare against
+
+        Returns:
+            true if both hands have the same strength
+        """
+        if not isinstance(other, Hand):
+            return NotImplemented
+        return self.key == other.key
+
+    def __hash__(self) -> int:
+        """
+        dunder hash method, consistent with __eq__
+
+        Returns:
+            the hash of this hand's strength key
+        """
+        return hash(self.key)
 
     def __len__(self) -> int:
         """
@@ -395,7 +554,7 @@ class Hand:
         Returns:
             this hand as repr
         """
-        return f"<Hand[{self.size}]({self.rank.name}) {self}>"
+        return f"<Hand[{self.size}]({RANKS[self.key[0]].name}) {self}>"
 
     @classmethod
     def get(cls, text: str) -> "Hand":
@@ -415,11 +574,14 @@ class Hand:
     @property
     def rank(self) -> Rank:  # noqa: PLR0911
         """
-        get the rank of this hand
+        get the rank of this hand, using the best five cards of a six or seven card hand
 
         Returns:
             a rank object representing the rank of this hand
         """
+        strength = self.strength
+        if strength:
+            return RANKS[category(strength)]
         if self.is_royal_flush:
             return Hand.Ranks.ROYAL_FLUSH
         if self.is_straight_flush:
@@ -440,6 +602,67 @@ class Hand:
             return Hand.Ranks.PAIR
         return Hand.Ranks.HIGH_CARD
 
+    @property
+    def strength(self) -> int:
+        """
+        the lookup table strength of this hand, see gamble.models.evaluator
+
+        six and seven card hands are scored by their best five cards
+
+        Returns:
+            the strength of this hand, higher is better, or 0 if it can't be evaluated
+        """
+        return evaluate(self)
+
+    @property
+    def key(self) -> tuple[int, ...]:
+        """
+        a comparable key for this hand, with full kicker tie breaking, computed once
+
+        the key is the rank value followed by the tie breaking ranks, from 0 (two) to
+        12 (ace). five to seven card hands are keyed by the lookup table strength,
+        other sizes by their ranks ordered by count and then by rank
+
+        Returns:
+            the strength key of this hand
+        """
+        if self._key is None:
+            strength = self.strength
+            if strength:
+                self._key = (
+                    category(strength),
+                    *((strength >> (4 * (4 - i))) & 0xF for i in range(5)),
+                )
+            else:
+                counts = Counter((x.value.value + 11) % 13 for x in self.cards)
+                ordered = sorted(counts, key=lambda x: (counts[x], x), reverse=True)
+                self._key = (self.rank.value, *ordered)
+        return self._key
+
+    @property
+    def value_counts(self) -> Counter:
+        """
+        the number of cards of each value in this hand, counted on first use
+
+        Returns:
+            a counter of card value -> number of cards
+        """
+        if self._value_counts is None:
+            self._value_counts = Counter([x.value.value for x in self.cards])
+        return self._value_counts
+
+    @property
+    def suit_counts(self) -> Counter:
+        """
+        the number of cards of each suit in this hand, counted on first use
+
+        Returns:
+            a counter of suit value -> number of cards
+        """
+        if self._suit_counts is None:
+            self._suit_counts = Counter([x.suit.value for x in self.cards])
+        return self._suit_counts
+
     @property
     def _vals(self) -> list[int]:
         """
@@ -563,45 +786,118 @@ class Hand:
         return self._vals[0] == 2
 
 
-class Deck:
+RANKS = tuple(Hand.Ranks.all())
+
+
+class CardCounts:
+    """
+    membership and composition queries over a per card count vector
+
+    subclasses keep counts, the number of copies left of each card, indexed by card code,
+    in step with their own draws. a Deck only recounts when its cards are reassigned,
+    so changing deck.cards in place leaves the counts stale
+    """
+
+    counts: list[int]
+
+    def __contains__(self, item: object) -> bool:
+        """
+        dunder contains method
+
+        Args:
+            item: the item to check for
+
+        Returns:
+            true if there is a copy of the given card left
+        """
+        if not isinstance(item, Card):
+            return False
+        return self.counts[item.code] > 0
+
+    def count(self, card: Card) -> int:
+        """
+        the number of copies of a card left
+
+        Args:
+            card: the card to count
+
+        Returns:
+            the number of copies left
+        """
+        return self.counts[card.code]
+
+    @property
+    def composition(self) -> dict[int, int]:
+        """
+        the number of cards of each value left, across every suit
+
+        Returns:
+            a dict of card value (1 for ace to 13 for king) -> number of cards left
+        """
+        counts = self.counts
+        return {
+            value: counts[value - 1] + counts[value + 12] + counts[value + 25] + counts[value + 38]
+            for value in range(1, 14)
+        }
+
+    @property
+    def tens_remaining(self) -> int:
+        """
+        the number of ten valued cards (10, J, Q, K) left
+
+        Returns:
+            the number of tens left
+        """
+        composition = self.composition
+        return sum(composition[x] for x in range(10, 14))
+
+    @property
+    def high_low_ratio(self) -> float:
+        """
+        the ratio of high cards (10 to ace) to low cards (2 to 6) left
+
+        Returns:
+            high cards per low card, or infinity if there are no low cards left
+        """
+        composition = self.composition
+        high = sum(composition[x] for x in (1, 10, 11, 12, 13))
+        low = sum(composition[x] for x in range(2, 7))
+        return high / low if low else float("inf")
+
+
+class Deck(CardCounts):
     """
     playing card deck model
 
     Args:
         cards: a list of cards for this deck
         shuffle: if we should start with the deck shuffled
+        rng: the random generator for this deck, defaults to the global random state
+        lazy: if shuffles should only randomize each position as it is reached
     """
 
     def __init__(
-        self, cards: list[Card] | None = None, shuffle: bool = True, default_draw_count: int = 1
+        self,
+        cards: list[Card] | None = None,
+        shuffle: bool = True,
+        default_draw_count: int = 1,
+        rng: random.Random | None = None,
+        lazy: bool = False,
     ) -> None:
-        if cards:
-            self.cards = cards
-        else:
+        if not cards:
             # lets start with a default deck of 52
-            self.cards = []
-            self.default_deck(self.cards)
-            self.cards.reverse()
+            cards = []
+            self.default_deck(cards)
+            cards.reverse()
+        self.cards = cards
+        self.rng = rng if rng is not None else default_rng()
+        self.lazy = lazy
         self.shuffles = 0
         self.draws = 0
         self.default_draw_count = default_draw_count
         if shuffle:
             self.shuffle()
 
-    def __contains__(self, item: object) -> bool:
-        """
-        dunder contains method
-
-        Args:
-            item: the item to check for in this deck
-
-        Returns:
-            true if this deck contains the given object
-        """
-        if not isinstance(item, Card):
-            return False
-        return item in self.cards
-
     def __str__(self) -> str:
         """
         string representation of a deck
@@ -629,19 +925,70 @@ class Deck:
         """
         return self.cards[index]
 
+    @property
+    def cards(self) -> list[Card]:
+        """
+        the cards in this deck, from the bottom to the top
+
+        any positions a lazy shuffle left pending are randomized first. the counts
+        only track draws and reassignment of this list, so don't change it in place
+
+        Returns:
+            the list of cards
+        """
+        self._settle(len(self._cards))
+        return self._cards
+
+    @cards.setter
+    def cards(self, cards: list[Card]) -> None:
+        """
+        replace the cards in this deck, in order, and recount them
+
+        changing the list in place is not supported, as the counts would go stale,
+        so assign a new list instead
+
+        Args:
+            cards: the new list of cards, from the bottom to the top
+        """
+        self._cards = cards
+        self._unsettled = 0
+        self.counts = [0] * 52
+        for card in cards:
+            self.counts[card.code] += 1
+
+    def _settle(self, count: int) -> None:
+        """
+        randomize the top positions of the deck that a lazy shuffle left pending
+
+        this is the top down fisher-yates shuffle, run only as far as needed, so
+        the cards drawn follow the same distribution as a full shuffle
+
+        Args:
+            count: the number of positions from the top that need to be settled
+        """
+        stop = max(len(self._cards) - count, 0)
+        if self._unsettled <= stop:
+            return
+        cards = self._cards
+        randrange = self.rng.randrange
+        for i in range(self._unsettled - 1, stop - 1, -1):
+            j = randrange(i + 1)
+            cards[i], cards[j] = cards[j], cards[i]
+        self._unsettled = stop
+
     def clear(self) -> None:
         """
         clear the deck of all cards
         """
-        self.cards[:] = []
+        self._cards[:] = []
+        self._unsettled = 0
+        self.counts[:] = [0] * 52
 
     def default_deck(self, cards: list[Card]) -> None:
         """
         load the standard 52 cards into the given set of cards
         """
-        for suit in Card.Suits.all():
-            for value in Card.Values.all():
-                cards.append(Card(value=value, suit=suit))
+        cards.extend(CARDS)
 
     @property
     def top(self) -> Card:
@@ -651,7 +998,8 @@ class Deck:
         Returns:
             a card off the top of the deck
         """
-        return self.cards[-1]
+        self._settle(1)
+        return self._cards[-1]
 
     @property
     def bottom(self) -> Card:
@@ -671,12 +1019,14 @@ class Deck:
         Returns:
             the number of cards left
         """
-        return len(self.cards)
+        return len(self._cards)
 
     def draw(self, times: int = -1) -> Card | list[Card]:
         """
         draws the given number of cards from the deck
 
+        more than one card is sliced off the top of the deck at once
+
         Args:
             times: the number of times to draw
 
@@ -686,14 +1036,81 @@ class Deck:
         if times == -1:
             times = self.default_draw_count
         if times == 1:
+            self._settle(1)
+            card = self._cards.pop()
+            self.counts[card.code] -= 1
             self.draws += 1
-            return self.cards.pop()
-        cards = []
-        for _ in range(times):
-            self.draws += 1
-            cards.append(self.cards.pop())
+            return card
+        if times <= 0:
+            return []
+        if times > len(self._cards):
+            raise IndexError(f"can't draw {times} cards from a deck of {len(self._cards)}")
+        self._settle(times)
+        cards = self._cards[: -times - 1 : -1]
+        del self._cards[-times:]
+        counts = self.counts
+        for card in cards:
+            counts[card.code] -= 1
+        self.draws += times
         return cards
 
+    def deal(self, players: int, cards_each: int, order: str = "round_robin") -> list[Hand]:
+        """
+        deal a hand to every player, drawing every card at once
+
+        Args:
+            players: the number of players to deal to
+            cards_each: the number of cards in each hand
+            order: "round_robin" to deal one card to each player in turn, or "block"
+                to deal each player all of their cards at once
+
+        Returns:
+            a list of hands, one per player
+        """
+        if order not in ("round_robin", "block"):
+            raise GambleException('the order must be "round_robin" or "block"')
+        cards = self.draw(times=players * cards_each)
+        cards = cards if isinstance(cards, list) else [cards]
+        if order == "block":
+            return [Hand(cards[i * cards_each : (i + 1) * cards_each]) for i in range(players)]
+        return [Hand(cards[i::players]) for i in range(players)]
+
+    @classmethod
+    def deal_many(
+        cls,
+        n_tables: int,
+        players: int,
+        cards_each: int,
+        order: str = "round_robin",
+        rng: random.Random | None = None,
+        **kwargs: Any,
+    ) -> list[list[Hand]]:
+        """
+        deal hands at many tables, each from its own freshly shuffled deck
+
+        one unshuffled template deck is built, and each table shuffles its own copy of
+        it, of the same deck class
+
+        Args:
+            n_tables: the number of tables to deal
+            players: the number of players at each table
+            cards_each: the number of cards in each hand
+            order: "round_robin" or "block", see deal
+            rng: the random generator for every table, defaults to the global random state
+            **kwargs: passed to the deck constructor, like num_decks for a MultiDeck
+
+        Returns:
+            a list of the hands dealt at each table
+        """
+        template = cls(rng=rng, shuffle=False, **kwargs)
+        tables = []
+        for _ in range(n_tables):
+            deck = copy.copy(template)
+            deck.cards = list(template._cards)
+            deck.shuffle()
+            tables.append(deck.deal(players, cards_each, order))
+        return tables
+
     def draw_hand(self, size: int = 5) -> Hand:
         """
         draw a hand from this deck
@@ -711,29 +1128,44 @@ class Deck:
         """
         shuffle the deck
 
+        a lazy deck only marks every position as pending, and randomizes each one
+        as it is reached. any number of shuffles leaves the deck uniformly random,
+        so times only adds to the shuffles counter
+
         Args:
             times: the number of times to shuffle the deck
         """
+        if self.lazy:
+            self.shuffles += times
+            self._unsettled = len(self._cards)
+            return
         for _ in range(times):
             self.shuffles += 1
-            random.shuffle(self.cards)
+            self.rng.shuffle(self._cards)
+        self._unsettled = 0
 
 
 class EuchreDeck(Deck):
     """
     deck specifically for euchre
-    """
 
-    def __init__(self, **_: Any) -> None:
-        cards: list[Card] = []
+    Args:
+        rng: the random generator for this deck, defaults to the global random state
+        lazy: if shuffles should only randomize each position as it is reached
+        shuffle: if the deck should start shuffled
+    """
 
+    def __init__(
+        self,
+        rng: random.Random | None = None,
+        lazy: bool = False,
+        shuffle: bool = True,
+        **_: Any,
+    ) -> None:
         # euchre uses 9, 10, J, Q, K, A of all suits
-        values = [x for x in Card.Values.all() if x.value >= 9 or x.value == 1]
-        for suit in Card.Suits.all():
-            for value in values:
-                cards.append(Card(value=value, suit=suit))
+        cards = [x for x in CARDS if x.value.value >= 9 or x.value.value == 1]
         cards.reverse()
-        super().__init__(cards=cards)
+        super().__init__(cards=cards, shuffle=shuffle, rng=rng, lazy=lazy)
 
 
 class MultiDeck(Deck):
@@ -742,13 +1174,22 @@ class MultiDeck(Deck):
 
     Args:
         num_decks: the number of standard decks to combine into one deck
+        rng: the random generator for this deck, defaults to the global random state
+        lazy: if shuffles should only randomize each position as it is reached
+        shuffle: if the deck should start shuffled
     """
 
-    def __init__(self, num_decks: int = 2) -> None:
+    def __init__(
+        self,
+        num_decks: int = 2,
+        rng: random.Random | None = None,
+        lazy: bool = False,
+        shuffle: bool = True,
+    ) -> None:
         cards: list[Card] = []
         for _ in range(num_decks):
             self.default_deck(cards)
-        super().__init__(cards=cards)
+        super().__init__(cards=cards, shuffle=shuffle, rng=rng, lazy=lazy)
 
 
 class BlackJackDeck(MultiDeck):
@@ -757,7 +1198,16 @@ class BlackJackDeck(MultiDeck):
 
     Args:
         num_decks: the number of standard decks to combine into this blackjack shoe
+        rng: the random generator for this shoe, defaults to the global random state
+        lazy: if shuffles should only randomize each position as it is reached
+        shuffle: if the shoe should start shuffled
     """
 
-    def __init__(self, num_decks: int = 8) -> None:
-        super().__init__(num_decks=num_decks)
+    def __init__(
+        self,
+        num_decks: int = 8,
+        rng: random.Random | None = None,
+        lazy: bool = False,
+        shuffle: bool = True,
+    ) -> None:
+        super().__init__(num_decks=num_decks, rng=rng, lazy=lazy, shuffle=shuffle)
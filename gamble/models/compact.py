@@ -0,0 +1,391 @@
+"""
+compact decks stored as card codes, for simulations that deal many decks
+"""
+
+import random
+from collections.abc import Iterable, Iterator
+from gamble.errors import GambleException
+from gamble.models.cards import CARDS, Card, CardCounts
+from gamble.models.evaluator import HasCards, HasCode, to_codes
+from gamble.rng import default_rng
+
+
+class DeckBatch:
+    """
+    many independently shuffled decks, stored as one flat bytearray of card codes
+
+    row i holds the order of deck i, and DeckView gives a Deck like view over one
+    row, so tables can be dealt without creating any Deck or Card objects. the
+    number of cards drawn from each row is kept in the batch, so every view of a
+    row shares it, and shuffling the batch puts every card back
+
+    Args:
+        size: the number of decks in the batch
+        cards: the cards in every deck, as cards, card codes or a Deck, defaults to 52
+        shuffle: if the decks should start shuffled
+        rng: the random generator for the batch, defaults to the global random state
+    """
+
+    def __init__(
+        self,
+        size: int,
+        cards: Iterable[int | HasCode] | HasCards | None = None,
+        shuffle: bool = True,
+        rng: random.Random | None = None,
+    ) -> None:
+        self.size = size
+        self.template = to_codes(cards) if cards is not None else list(range(52))
+        self.width = len(self.template)
+        self.rng = rng if rng is not None else default_rng()
+        self.shuffles = 0
+        self.codes = bytearray(bytes(self.template) * size)
+        self.draws = [0] * size
+        if shuffle:
+            self.shuffle()
+
+    def __str__(self) -> str:
+        """
+        dunder str method
+
+        Returns:
+            the string representation of this batch
+        """
+        return f"<DeckBatch[{self.size}x{self.width}]>"
+
+    def __repr__(self) -> str:
+        """
+        dunder repr method
+
+        Returns:
+            the repr representation of this batch
+        """
+        return self.__str__()
+
+    def __len__(self) -> int:
+        """
+        dunder len method
+
+        Returns:
+            the number of decks in this batch
+        """
+        return self.size
+
+    def __getitem__(self, index: int) -> "DeckView":
+        """
+        get a view over one deck in the batch
+
+        Args:
+            index: the row of the deck
+
+        Returns:
+            a view that draws from where the last draw from this row stopped
+        """
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("deck index out of range")
+        return DeckView(self, index)
+
+    def __iter__(self) -> Iterator["DeckView"]:
+        """
+        iterate over a view of every deck in the batch
+
+        Returns:
+            an iterator of views
+        """
+        return (DeckView(self, x) for x in range(self.size))
+
+    def row(self, index: int) -> bytes:
+        """
+        the card codes of one deck, in draw order, including any already drawn
+
+        Args:
+            index: the row of the deck
+
+        Returns:
+            the codes of the deck
+        """
+        return bytes(self.codes[index * self.width : (index + 1) * self.width])
+
+    def shuffle(self) -> None:
+        """
+        shuffle every deck in the batch independently, in place, with every card back in
+        """
+        self.shuffles += 1
+        self.draws[:] = [0] * self.size
+        order = list(self.template)
+        shuffle = self.rng.shuffle
+        width = self.width
+        codes = self.codes
+        for start in range(0, self.size * width, width):
+            shuffle(order)
+            codes[start : start + width] = bytes(order)
+
+
+class DeckView:
+    """
+    a Deck like view over one row of a DeckBatch, that draws from the front of the row
+
+    Args:
+        batch: the batch holding the deck
+        index: the row of the deck in the batch
+    """
+
+    __slots__ = ("batch", "end", "index", "start")
+
+    def __init__(self, batch: DeckBatch, index: int) -> None:
+        self.batch = batch
+        self.index = index
+        self.start = index * batch.width
+        self.end = self.start + batch.width
+
+    def __str__(self) -> str:
+        """
+        dunder str method
+
+        Returns:
+            the string representation of this view
+        """
+        return f"<DeckView[{self.cards_left}]>"
+
+    def __repr__(self) -> str:
+        """
+        dunder repr method
+
+        Returns:
+            the repr representation of this view
+        """
+        return self.__str__()
+
+    def __len__(self) -> int:
+        """
+        dunder len method
+
+        Returns:
+            the number of cards left in this deck
+        """
+        return self.cards_left
+
+    @property
+    def draws(self) -> int:
+        """
+        number of cards drawn from this deck, shared by every view of its row
+
+        Returns:
+            the number of cards drawn
+        """
+        return self.batch.draws[self.index]
+
+    @property
+    def cards_left(self) -> int:
+        """
+        number of cards left in the deck
+
+        Returns:
+            the number of cards left
+        """
+        return self.end - self.start - self.draws
+
+    @property
+    def top(self) -> Card:
+        """
+        the top card of the deck
+
+        Returns:
+            the next card to be drawn
+        """
+        if not self.cards_left:
+            raise IndexError("the deck is empty")
+        return CARDS[self.batch.codes[self.start + self.draws]]
+
+    def draw_codes(self, times: int = 1) -> bytes:
+        """
+        draw card codes off the top of the deck, without creating any cards
+
+        Args:
+            times: the number of cards to draw
+
+        Returns:
+            the codes of the cards drawn
+        """
+        if times < 0:
+            raise GambleException(f"can't draw a negative number of cards: {times}")
+        if times > self.cards_left:
+            raise IndexError(f"can't draw {times} cards from a deck of {self.cards_left}")
+        position = self.start + self.draws
+        self.batch.draws[self.index] += times
+        return bytes(self.batch.codes[position : position + times])
+
+    def draw(self, times: int = 1) -> Card | list[Card]:
+        """
+        draws the given number of cards from the deck
+
+        Args:
+            times: the number of times to draw
+
+        Returns:
+            a card or list of cards drawn
+        """
+        codes = self.draw_codes(times)
+        if times == 1:
+            return CARDS[codes[0]]
+        return [CARDS[x] for x in codes]
+
+
+class CompactShoe(CardCounts):
+    """
+    a multi-deck shoe stored as a bytearray of card codes and a per card count vector
+
+    every card drawn is one of the 52 shared CARDS, so no Card objects are created
+    for the shoe. the cut card is placed at the penetration, and needs_shuffle
+    reports when it has been reached
+
+    Args:
+        num_decks: the number of standard decks in the shoe
+        penetration: the share of the shoe dealt before the cut card, from 0 to 1
+        shuffle: if the shoe should start shuffled
+        rng: the random generator for this shoe, defaults to the global random state
+    """
+
+    def __init__(
+        self,
+        num_decks: int = 8,
+        penetration: float = 0.75,
+        shuffle: bool = True,
+        rng: random.Random | None = None,
+    ) -> None:
+        if not 0 < penetration <= 1:
+            raise GambleException("penetration must be greater than 0 and at most 1")
+        self.num_decks = num_decks
+        self.penetration = penetration
+        self.rng = rng if rng is not None else default_rng()
+        self.codes = bytearray(bytes(range(52)) * num_decks)
+        self.cut_card = int(len(self.codes) * penetration)
+        self.counts = [num_decks] * 52
+        self.position = 0
+        self.shuffles = 0
+        self.draws = 0
+        if shuffle:
+            self.shuffle()
+
+    def __str__(self) -> str:
+        """
+        dunder str method
+
+        Returns:
+            the string representation of this shoe
+        """
+        return f"<CompactShoe[{self.cards_left}]>"
+
+    def __repr__(self) -> str:
+        """
+        dunder repr method
+
+        Returns:
+            the repr representation of this shoe
+        """
+        return self.__str__()
+
+    def __len__(self) -> int:
+        """
+        dunder len method
+
+        Returns:
+            the number of cards left in this shoe
+        """
+        return self.cards_left
+
+    @property
+    def cards_left(self) -> int:
+        """
+        number of cards left in the shoe
+
+        Returns:
+            the number of cards left
+        """
+        return len(self.codes) - self.position
+
+    @property
+    def needs_shuffle(self) -> bool:
+        """
+        if the cut card has been reached
+
+        Returns:
+            true once the penetration has been dealt
+        """
+        return self.position >= self.cut_card
+
+    @property
+    def top(self) -> Card:
+        """
+        the top card of the shoe
+
+        Returns:
+            the next card to be drawn
+        """
+        if not self.cards_left:
+            raise IndexError("the shoe is empty")
+        return CARDS[self.codes[self.position]]
+
+    def draw_code(self) -> int:
+        """
+        draw one card code off the top of the shoe, without creating any cards
+
+        Returns:
+            the code of the card drawn
+        """
+        if not self.cards_left:
+            raise IndexError("can't draw from an empty shoe")
+        code = self.codes[self.position]
+        self.position += 1
+        self.draws += 1
+        self.counts[code] -= 1
+        return code
+
+    def draw_codes(self, times: int = 1) -> bytes:
+        """
+        draw card codes off the top of the shoe, without creating any cards
+
+        Args:
+            times: the number of cards to draw
+
+        Returns:
+            the codes of the cards drawn
+        """
+        if times < 0:
+            raise GambleException(f"can't draw a negative number of cards: {times}")
+        if times > self.cards_left:
+            raise IndexError(f"can't draw {times} cards from a shoe of {self.cards_left}")
+        codes = bytes(self.codes[self.position : self.position + times])
+        self.position += times
+        self.draws += times
+        counts = self.counts
+        for code in codes:
+            counts[code] -= 1
+        return codes
+
+    def draw(self, times: int = 1) -> Card | list[Card]:
+        """
+        draws the given number of cards from the shoe
+
+        Args:
+            times: the number of times to draw
+
+        Returns:
+            a card or list of cards drawn
+        """
+        codes = self.draw_codes(times)
+        if times == 1:
+            return CARDS[codes[0]]
+        return [CARDS[x] for x in codes]
+
+    def shuffle(self) -> None:
+        """
+        gather every card back into the shoe and shuffle it
+        """
+        self.shuffles += 1
+        order = list(self.codes)
+        self.rng.shuffle(order)
+        self.codes[:] = bytes(order)
+        self.counts[:] = [self.num_decks] * 52
+        self.position = 0
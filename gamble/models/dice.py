@@ -2,8 +2,23 @@
 die and dice submodule
 """
 
+import functools
+import itertools
+import operator
 import random
+import re
+from collections.abc import Iterator
+from dataclasses import dataclass
 from gamble.errors import GambleException
+from gamble.rng import default_rng
+from gamble.stats import RollStats
+from gamble.models.distribution import AliasTable, Distribution
+
+DICE_TERM = re.compile(
+    r"(?P<sign>[+-]?)(?P<count>\d*)d(?P<sides>\d+)(?P<explode>!?)"
+    r"(?:r(?P<reroll>\d+))?(?:(?P<keep>kh|kl|dh|dl|k)(?P<keep_count>\d+))?"
+)
+EXPLODE_DEPTH = 20
 
 
 class Die:
@@ -12,14 +27,17 @@ class Die:
 
     Args:
         sides: the number of sides to this die
+        rng: the random generator for this die, defaults to the global random state
     """
 
-    def __init__(self, sides: int = 6) -> None:
+    def __init__(self, sides: int = 6, rng: random.Random | None = None) -> None:
         if abs(int(sides)) < 2:
             raise GambleException("A die must have at least 2 sides")
         self.sides = abs(int(sides))
         self.negative = sides <= 0
         self.multiplier = -1 if self.negative else 1
+        self.rng = rng if rng is not None else default_rng()
+        self.stats: RollStats | None = None
         self.rolls = 0
 
     def __str__(self) -> str:
@@ -116,7 +134,36 @@ class Die:
         Returns:
             the min for this die
         """
-        return self.sides if self.negative else 1
+        return -self.sides if self.negative else 1
+
+    @property
+    def faces(self) -> range:
+        """
+        the faces of this die, with the multiplier applied
+
+        Returns:
+            a range over every value this die can roll
+        """
+        return range(self.multiplier, (self.sides + 1) * self.multiplier, self.multiplier)
+
+    @property
+    def weights(self) -> dict[int, int]:
+        """
+        the relative integer weight of each value this die can roll
+
+        Returns:
+            a dict of value -> weight
+        """
+        return dict.fromkeys(self.faces, 1)
+
+    def distribution(self) -> Distribution:
+        """
+        the exact distribution of a single roll of this die
+
+        Returns:
+            a distribution over the values this die can roll
+        """
+        return Distribution(self.weights)
 
     def roll(self) -> int:
         """
@@ -125,9 +172,37 @@ class Die:
         Returns:
             the value rolled by this die
         """
-        value = random.randrange(self.sides) + 1  # nosec
+        value = (self.rng.randrange(self.sides) + 1) * self.multiplier  # nosec
         self.rolls += 1
-        return value * self.multiplier
+        if self.stats:
+            self.stats.update(value)
+        return value
+
+    def roll_many(self, num_rolls: int = 1) -> list[int]:
+        """
+        roll the die multiple times in a single batch
+
+        Args:
+            num_rolls: the number of times to roll the die
+
+        Returns:
+            a list of the values rolled by this die
+        """
+        self.rolls += num_rolls
+        rolls = self.rng.choices(self.faces, k=num_rolls)  # nosec
+        if self.stats:
+            self.stats.update_many(rolls)
+        return rolls
+
+    def track_stats(self) -> RollStats:
+        """
+        start recording online statistics for every roll of this die
+
+        Returns:
+            the accumulator that rolls are recorded in
+        """
+        self.stats = RollStats(self.min, self.max)
+        return self.stats
 
 
 class RiggedDie(Die):
@@ -137,16 +212,49 @@ class RiggedDie(Die):
     Args:
         sides: the number of sides to this die
         rigged_factor: int from 0-100 to manipulate the die into a high roll
+        rng: the random generator for this die, defaults to the global random state
     """
 
-    def __init__(self, sides: int = 6, rigged_factor: int = 50) -> None:
+    def __init__(
+        self, sides: int = 6, rigged_factor: int = 50, rng: random.Random | None = None
+    ) -> None:
         self.rigged_factor = rigged_factor
         if rigged_factor < 0 or rigged_factor > 100:
             raise GambleException("The rigged factor must be between 0 and 100")
         if sides < 2:
             raise GambleException("the die must have at least 2 sides")
 
-        super().__init__(sides)
+        super().__init__(sides, rng=rng)
+        weights = self.weights
+        self._population = list(weights)
+        self._cum_weights = list(itertools.accumulate(weights.values()))
+
+    @property
+    def min(self) -> int:
+        """
+        the min value this die can roll, a rigged d2 can land on 0
+
+        Returns:
+            the min for this die
+        """
+        return min(super().min, self.sides - 2)
+
+    @property
+    def weights(self) -> dict[int, int]:
+        """
+        the relative integer weight of each value this die can roll
+
+        a roll lands in the top 3 with probability (rigged_factor + 1) / 101,
+        otherwise it falls back to a fair roll
+
+        Returns:
+            a dict of value -> weight
+        """
+        weights = dict.fromkeys(self.faces, 3 * (100 - self.rigged_factor))
+        for face in (self.sides, self.sides - 1, self.sides - 2):
+            value = face * self.multiplier
+            weights[value] = weights.get(value, 0) + (self.rigged_factor + 1) * self.sides
+        return weights
 
     def roll(self) -> int:
         """
@@ -155,12 +263,170 @@ class RiggedDie(Die):
         Returns:
             the value rolled by this die
         """
-        if random.randrange(101) <= self.rigged_factor:  # nosec
-            value = [self.sides, self.sides - 1, self.sides - 2][random.randrange(3)]  # nosec
+        if self.rng.randrange(101) <= self.rigged_factor:  # nosec
+            value = [self.sides, self.sides - 1, self.sides - 2][self.rng.randrange(3)]  # nosec
+            value *= self.multiplier
             self.rolls += 1
-            return value * self.multiplier
+            if self.stats:
+                self.stats.update(value)
+            return value
         return super().roll()
 
+    def roll_many(self, num_rolls: int = 1) -> list[int]:
+        """
+        roll the rigged die multiple times in a single batch
+
+        Args:
+            num_rolls: the number of times to roll the die
+
+        Returns:
+            a list of the values rolled by this die
+        """
+        self.rolls += num_rolls
+        rolls = self.rng.choices(
+            self._population, cum_weights=self._cum_weights, k=num_rolls
+        )  # nosec
+        if self.stats:
+            self.stats.update_many(rolls)
+        return rolls
+
+
+@dataclass(frozen=True)
+class DiceGroup:
+    """
+    a group of identical dice in a compiled roll plan
+
+    Args:
+        count: the number of dice in this group
+        sides: the number of sides on each die, negative if the dice subtract
+        rigged_factor: int from 0-100 to manipulate the dice into a high roll, or -1
+        keep: the number of dice to keep, 0 to keep them all
+        keep_highest: if we keep the highest dice, otherwise the lowest
+        explode: if a die that rolls its max face is rolled again and added, see EXPLODE_DEPTH
+        reroll: dice that roll this value or lower are rolled once more, 0 to never reroll
+    """
+
+    count: int
+    sides: int
+    rigged_factor: int = -1
+    keep: int = 0
+    keep_highest: bool = True
+    explode: bool = False
+    reroll: int = 0
+
+    @property
+    def is_plain(self) -> bool:
+        """
+        check if this group is just a sum of dice, without any modifiers
+
+        Returns:
+            true if the group has no keep, explode or reroll modifiers
+        """
+        return not (self.keep or self.explode or self.reroll)
+
+    @property
+    def notation(self) -> str:
+        """
+        the d-notation for this group
+
+        Returns:
+            this group as a d-notation term
+        """
+        keep = f"k{'h' if self.keep_highest else 'l'}{self.keep}" if self.keep else ""
+        reroll = f"r{self.reroll}" if self.reroll else ""
+        explode = "!" if self.explode else ""
+        sign = "-" if self.sides < 0 else ""
+        return f"{sign}{self.count}d{abs(self.sides)}{explode}{reroll}{keep}"
+
+    def bounds(self, die: Die) -> tuple[int, int]:
+        """
+        the min and max totals this group can roll
+
+        Args:
+            die: the die rolled by this group
+
+        Returns:
+            a tuple of the min and max
+        """
+        low, high = die.min, die.max
+        if self.explode:
+            if die.negative:
+                low *= EXPLODE_DEPTH + 1
+            else:
+                high *= EXPLODE_DEPTH + 1
+        kept = self.keep or self.count
+        return low * kept, high * kept
+
+    def distribution(self, die: Die) -> Distribution:
+        """
+        the exact distribution of this group's total
+
+        Args:
+            die: the die rolled by this group
+
+        Returns:
+            a distribution over every total this group can roll
+        """
+        weights = raw = die.weights
+        total = raw_total = sum(weights.values())
+        if self.reroll:
+            rerolled = sum(w for value, w in weights.items() if abs(value) <= self.reroll)
+            weights = {
+                value: w * (rerolled + (0 if abs(value) <= self.reroll else total))
+                for value, w in weights.items()
+            }
+            total *= total
+        if self.explode:
+            # the chain is built from the last roll back to the first, and only the
+            # first roll is rerolled, extra dice from an explosion are rolled as is
+            top = die.sides * die.multiplier
+            chain, chain_total = raw, raw_total
+            levels = [(raw, raw_total)] * (EXPLODE_DEPTH - 1) + [(weights, total)]
+            for base, base_total in levels:
+                exploded = {value: w * chain_total for value, w in base.items() if value != top}
+                for value, w in chain.items():
+                    exploded[value + top] = exploded.get(value + top, 0) + base[top] * w
+                chain, chain_total = exploded, chain_total * base_total
+            weights = chain
+        face = Distribution(weights)
+        if self.keep:
+            return face.keep(self.count, self.keep, self.keep_highest)
+        return face.repeat(self.count)
+
+    def roll_many(self, die: Die, num_rolls: int) -> list[int]:
+        """
+        roll this group multiple times, drawing the dice for every roll in batches
+
+        Args:
+            die: the die rolled by this group
+            num_rolls: the number of times to roll the group
+
+        Returns:
+            a list of the totals rolled by this group
+        """
+        faces = die.roll_many(self.count * num_rolls)
+        if self.reroll:
+            redo = [i for i, value in enumerate(faces) if abs(value) <= self.reroll]
+            for i, value in zip(redo, die.roll_many(len(redo)), strict=True):
+                faces[i] = value
+        if self.explode:
+            pending = [i for i, value in enumerate(faces) if abs(value) == die.sides]
+            for _ in range(EXPLODE_DEPTH):
+                if not pending:
+                    break
+                extra = die.roll_many(len(pending))
+                for i, value in zip(pending, extra, strict=True):
+                    faces[i] += value
+                pending = [
+                    i for i, value in zip(pending, extra, strict=True) if abs(value) == die.sides
+                ]
+        if self.count == 1:
+            return faces
+        rolls = zip(*[iter(faces)] * self.count, strict=True)
+        if self.keep:
+            return [sum(sorted(x, reverse=self.keep_highest)[: self.keep]) for x in rolls]
+        return list(map(sum, rolls))
+
 
 class Dice:
     """
@@ -169,32 +435,26 @@ class Dice:
     Args:
         init_string: a d-notation string representing a set of dice
         rigged_factor: int from 0-100 to manipulate the die into a high roll
+        alias: if we should sample totals from a cached alias table instead of rolling each die
+        rng: the random generator for these dice, defaults to the global random state
     """
 
-    def __init__(self, init_string: str = "2d6", rigged_factor: int = -1) -> None:
-        self.__d_string = init_string.strip().lower().replace("-", "+-")
-        self.d_strings = [x.strip() for x in self.__d_string.split("+")]
-        self.dice: list[Die | RiggedDie] = []
-        self.bonuses: list[int] = []
-
-        for d_string in self.d_strings:
-            if "d" in d_string:
-                die_settings = [int(x) for x in d_string.split("d") if x]
-                if len(die_settings) == 1:
-                    self.dice.append(self.create_die(die_settings[0], rigged_factor=rigged_factor))
-                elif len(die_settings) > 1:
-                    num, value = die_settings
-                    negative = -1 if num < 0 else 1
-                    self.dice.extend(
-                        [self.create_die(value * negative, rigged_factor=rigged_factor)] * abs(num)
-                    )
-                else:
-                    raise GambleException("cannot create a die with no value!")
-            else:
-                self.bonuses.append(int(d_string))
-        self.dice = sorted(self.dice)
-        self.bonuses = sorted(self.bonuses)
+    def __init__(
+        self,
+        init_string: str = "2d6",
+        rigged_factor: int = -1,
+        alias: bool = False,
+        rng: random.Random | None = None,
+    ) -> None:
+        self.__d_string = init_string.strip().lower()
+        self.rigged_factor = rigged_factor
+        self.rng = rng if rng is not None else default_rng()
+        self.plan, bonuses = parse(self.__d_string, rigged_factor)
+        self.bonuses = list(bonuses)
+        self._dice = [self.create_die(x.sides, x.rigged_factor, self.rng) for x in self.plan]
         self.rolls = 0
+        self.stats: RollStats | None = None
+        self.alias_table = alias_table(self.normalized, rigged_factor) if alias else None
 
     def __str__(self) -> str:
         """
@@ -215,6 +475,26 @@ class Dice:
         """
         return self.__str__()
 
+    @property
+    def d_strings(self) -> list[str]:
+        """
+        the individual terms of the d-string these dice were created from
+
+        Returns:
+            a list of the d-notation terms
+        """
+        return [x.strip() for x in self.__d_string.replace("-", "+-").split("+") if x.strip()]
+
+    @property
+    def dice(self) -> list[Die | RiggedDie]:
+        """
+        every die rolled by these dice, smallest first
+
+        Returns:
+            a list of the die objects, repeated once per roll
+        """
+        return [die for die, count in self.groups for _ in range(count)]
+
     @property
     def parts(self) -> list[Die | int]:
         """
@@ -233,7 +513,7 @@ class Dice:
         Returns:
             the max for these dice + bonuses
         """
-        return sum([*[x.max for x in self.dice], *self.bonuses])
+        return sum([*[x.bounds(die)[1] for die, x in self.plan_dice], *self.bonuses])
 
     @property
     def min(self) -> int:
@@ -243,22 +523,79 @@ class Dice:
         Returns:
             the min for these dice + bonuses
         """
-        return sum([*[x.min for x in self.dice], *self.bonuses])
+        return sum([*[x.bounds(die)[0] for die, x in self.plan_dice], *self.bonuses])
 
-    def create_die(self, sides: int, rigged_factor: int = -1) -> Die | RiggedDie:
+    @property
+    def normalized(self) -> str:
+        """
+        a canonical d-notation string for these dice
+
+        Returns:
+            the normalized d-string, the same for any equivalent set of dice
+        """
+        return normalize(self.__d_string, self.rigged_factor)
+
+    @property
+    def groups(self) -> list[tuple[Die | RiggedDie, int]]:
+        """
+        the distinct die objects in these dice, with how many times each is rolled
+
+        Returns:
+            a list of (die, count) tuples
+        """
+        return [(die, group.count) for die, group in self.plan_dice]
+
+    @property
+    def plan_dice(self) -> list[tuple[Die | RiggedDie, DiceGroup]]:
+        """
+        the die object rolled for each group in the roll plan
+
+        Returns:
+            a list of (die, group) tuples
+        """
+        return list(zip(self._dice, self.plan, strict=True))
+
+    def distribution(self) -> Distribution:
+        """
+        the exact distribution of the total of these dice + bonuses
+
+        each distinct die is repeated by squaring, so large dice counts stay cheap
+
+        Returns:
+            a distribution over every total these dice can roll
+        """
+        result = Distribution.constant(sum(self.bonuses))
+        for die, group in self.plan_dice:
+            result += group.distribution(die)
+        return result
+
+    def track_stats(self) -> RollStats:
+        """
+        start recording online statistics for every roll of these dice
+
+        Returns:
+            the accumulator that rolls are recorded in
+        """
+        self.stats = RollStats(self.min, self.max)
+        return self.stats
+
+    def create_die(
+        self, sides: int, rigged_factor: int = -1, rng: random.Random | None = None
+    ) -> Die | RiggedDie:
         """
         helper to create dice
 
         Args:
             sides: the number of sides on a die
             rigged_factor: int from 0-100 to manipulate the die into a high roll
+            rng: the random generator for the die, defaults to the global random state
 
         Returns:
             A Die object that can be rigged
         """
         if rigged_factor != -1:
-            return RiggedDie(sides, rigged_factor)
-        return Die(sides)
+            return RiggedDie(sides, rigged_factor, rng=rng)
+        return Die(sides, rng=rng)
 
     def roll(self) -> int:
         """
@@ -268,45 +605,234 @@ class Dice:
             the value rolled by this dice
         """
         self.rolls += 1
-        rolls = [x.roll() for x in self.dice]
-        return sum([*rolls, *self.bonuses])
+        if self.alias_table:
+            total = self.alias_table.sample(self.rng)
+        else:
+            total = sum(self.bonuses)
+            for die, group in self.plan_dice:
+                if group.is_plain:
+                    total += sum(die.roll() for _ in range(group.count))
+                else:
+                    total += group.roll_many(die, 1)[0]
+        if self.stats:
+            self.stats.update(total)
+        return total
+
+    def roll_batch(self, num_rolls: int) -> list[int]:
+        """
+        roll dice multiple times, drawing every face for every roll in one go
+
+        each group draws all of its faces for all of the rolls in a single call,
+        then applies its rerolls, explosions and keeps to them in bulk
+
+        Args:
+            num_rolls: the number of times to roll the dice
+
+        Returns:
+            list of values rolled by these dice
+        """
+        self.rolls += num_rolls
+        if self.alias_table:
+            totals = self.alias_table.sample_many(num_rolls, self.rng)
+        else:
+            totals = [sum(self.bonuses)] * num_rolls
+            for die, group in self.plan_dice:
+                totals = list(map(operator.add, totals, group.roll_many(die, num_rolls)))
+        if self.stats:
+            self.stats.update_many(totals)
+        return totals
 
-    def roll_many(self, num_rolls: int = 2) -> list[int]:
+    def roll_many(self, num_rolls: int = 2, batch: bool = False) -> list[int]:
         """
         roll dice multiple times
 
         Args:
             num_rolls: the number of times to roll the dice
+            batch: if we should draw all of the rolls at once, see roll_batch
 
         Returns:
             list of values rolled by these dice
         """
+        if batch:
+            return self.roll_batch(num_rolls)
         return [self.roll() for _ in range(num_rolls)]
 
-    def max_of(self, num_rolls: int = 2) -> tuple[int, list[int]]:
+    def max_of(self, num_rolls: int = 2, batch: bool = False) -> tuple[int, list[int]]:
         """
         roll dice multiple times
 
         Args:
             num_rolls: the number of times to roll the dice
+            batch: if we should draw all of the rolls at once, see roll_batch
 
         Returns:
             a tuple with the max value rolled by the dice, and the dice rolls
         """
-        rolls = self.roll_many(num_rolls)
+        rolls = self.roll_many(num_rolls, batch=batch)
         max_roll = max(rolls)
         return max_roll, rolls
 
-    def min_of(self, num_rolls: int = 2) -> tuple[int, list[int]]:
+    def min_of(self, num_rolls: int = 2, batch: bool = False) -> tuple[int, list[int]]:
         """
         roll dice multiple times
 
         Args:
             num_rolls: the number of times to roll the dice
+            batch: if we should draw all of the rolls at once, see roll_batch
 
         Returns:
             a tuple with the min value rolled by the dice, and the dice rolls
         """
-        rolls = self.roll_many(num_rolls)
+        rolls = self.roll_many(num_rolls, batch=batch)
         min_roll = min(rolls)
         return min_roll, rolls
+
+    def roll_chunks(
+        self, num_rolls: int | None = None, chunk_size: int = 4096
+    ) -> Iterator[list[int]]:
+        """
+        lazily roll dice in batches of chunk_size
+
+        Args:
+            num_rolls: the total number of rolls, or None to roll forever
+            chunk_size: the number of rolls drawn per batch
+
+        Yields:
+            lists of up to chunk_size rolls
+        """
+        remaining = num_rolls
+        while remaining is None or remaining > 0:
+            chunk = chunk_size if remaining is None else min(chunk_size, remaining)
+            yield self.roll_batch(chunk)
+            if remaining is not None:
+                remaining -= chunk
+
+    def iter_rolls(self, num_rolls: int | None = None, chunk_size: int = 4096) -> Iterator[int]:
+        """
+        lazily roll dice, drawing the random numbers in batches but yielding one roll at a time
+
+        rolls is counted a batch at a time, so it includes rolls that are buffered
+        but not yet yielded
+
+        Args:
+            num_rolls: the total number of rolls, or None to roll forever
+            chunk_size: the number of rolls drawn per batch
+
+        Yields:
+            the value of each roll
+        """
+        for chunk in self.roll_chunks(num_rolls, chunk_size):
+            yield from chunk
+
+    def stream_max(self, num_rolls: int = 2, chunk_size: int = 4096) -> int:
+        """
+        roll dice multiple times, only keeping the highest roll so memory stays constant
+
+        Args:
+            num_rolls: the number of times to roll the dice
+            chunk_size: the number of rolls drawn per batch
+
+        Returns:
+            the max value rolled by the dice
+        """
+        return max(map(max, self.roll_chunks(num_rolls, chunk_size)))
+
+    def stream_min(self, num_rolls: int = 2, chunk_size: int = 4096) -> int:
+        """
+        roll dice multiple times, only keeping the lowest roll so memory stays constant
+
+        Args:
+            num_rolls: the number of times to roll the dice
+            chunk_size: the number of rolls drawn per batch
+
+        Returns:
+            the min value rolled by the dice
+        """
+        return min(map(min, self.roll_chunks(num_rolls, chunk_size)))
+
+
+@functools.lru_cache(maxsize=1024)
+def parse(d_string: str, rigged_factor: int = -1) -> tuple[tuple[DiceGroup, ...], tuple[int, ...]]:
+    """
+    compile a d-string into a roll plan of dice groups and flat bonuses
+
+    the result is cached, so a d-string is only ever parsed once
+
+    Args:
+        d_string: a d-notation string representing a set of dice
+        rigged_factor: int from 0-100 to manipulate the die into a high roll
+
+    Returns:
+        a tuple of the dice groups (smallest sides first) and the sorted bonuses
+    """
+    counts: dict[int, int] = {}
+    groups: list[DiceGroup] = []
+    bonuses: list[int] = []
+    for term in (x.strip() for x in d_string.strip().lower().replace("-", "+-").split("+")):
+        if not term:
+            continue
+        if "d" not in term:
+            bonuses.append(int(term))
+            continue
+        match = DICE_TERM.fullmatch(term)
+        if not match:
+            raise GambleException("cannot create a die with no value!")
+        count = int(match["count"] or 1)
+        sides = int(match["sides"]) * (-1 if match["sign"] == "-" else 1)
+        if not count:
+            continue
+        keep = count if not match["keep"] else int(match["keep_count"])
+        if match["keep"] in ("dh", "dl"):
+            keep = count - keep
+        if not 0 < keep <= count:
+            raise GambleException("must keep at least one die, and no more than are rolled!")
+        group = DiceGroup(
+            count=count,
+            sides=sides,
+            rigged_factor=rigged_factor,
+            keep=0 if keep == count else keep,
+            keep_highest=match["keep"] in (None, "k", "kh", "dl"),
+            explode=bool(match["explode"]),
+            reroll=int(match["reroll"] or 0),
+        )
+        if group.is_plain:
+            counts[sides] = counts.get(sides, 0) + count
+        else:
+            groups.append(group)
+    groups.extend(DiceGroup(counts[x], x, rigged_factor) for x in counts)
+    return tuple(sorted(groups, key=lambda x: x.sides)), tuple(sorted(bonuses))
+
+
+@functools.lru_cache(maxsize=1024)
+def normalize(d_string: str, rigged_factor: int = -1) -> str:
+    """
+    the canonical d-notation string for a d-string, without building any dice
+
+    Args:
+        d_string: a d-notation string representing a set of dice
+        rigged_factor: int from 0-100 to manipulate the die into a high roll
+
+    Returns:
+        the normalized d-string, the same for any equivalent set of dice
+    """
+    plan, bonuses = parse(d_string.strip().lower(), rigged_factor)
+    terms = sorted(x.notation for x in plan)
+    bonus = sum(bonuses)
+    if bonus:
+        terms.append(str(bonus))
+    return "+".join(terms).replace("+-", "-") or "0"
+
+
+@functools.lru_cache(maxsize=256)
+def alias_table(d_string: str, rigged_factor: int = -1) -> AliasTable:
+    """
+    build (or fetch from the cache) the alias table for a d-string
+
+    Args:
+        d_string: a d-notation string representing a set of dice
+        rigged_factor: int from 0-100 to manipulate the die into a high roll
+
+    Returns:
+        an alias table over the exact distribution of the dice total
+    """
+    return AliasTable(Dice(d_string, rigged_factor).distribution())
@@ -0,0 +1,340 @@
+"""
+exact probability distribution submodule
+"""
+
+import bisect
+import itertools
+import math
+import random
+from collections.abc import Iterator
+from fractions import Fraction
+from gamble.errors import GambleException
+from gamble.rng import default_rng
+
+
+def convolve(first: list[int], second: list[int]) -> list[int]:
+    """
+    convolve two lists of non-negative integer weights
+
+    each list is packed into a single big integer (kronecker substitution), so the
+    whole convolution is done by one big integer multiplication
+
+    Args:
+        first: the first list of weights
+        second: the second list of weights
+
+    Returns:
+        the convolution of the two lists
+    """
+    if not first or not second:
+        return []
+    # no coefficient of the product can be larger than the product of the totals
+    size = ((sum(first) * sum(second)).bit_length() + 8) // 8
+    packed = [
+        int.from_bytes(b"".join(x.to_bytes(size, "little") for x in weights), "little")
+        for weights in (first, second)
+    ]
+    raw = (packed[0] * packed[1]).to_bytes(size * (len(first) + len(second) - 1), "little")
+    return [int.from_bytes(raw[i : i + size], "little") for i in range(0, len(raw), size)]
+
+
+class Distribution:
+    """
+    an exact, discrete probability distribution over integer totals
+
+    Args:
+        weights: a dict of total -> non-negative integer weight
+    """
+
+    def __init__(self, weights: dict[int, int]) -> None:
+        support = [total for total, weight in weights.items() if weight]
+        if not support:
+            raise GambleException("a distribution needs at least one possible outcome")
+        self.min = min(support)
+        self.max = max(support)
+        self.weights = [0] * (self.max - self.min + 1)
+        for total in support:
+            self.weights[total - self.min] = weights[total]
+        self.total = sum(self.weights)
+        self.cumulative = list(itertools.accumulate(self.weights))
+
+    @classmethod
+    def from_list(cls, offset: int, weights: list[int]) -> "Distribution":
+        """
+        create a distribution from a dense list of weights
+
+        Args:
+            offset: the total that the first weight belongs to
+            weights: integer weights for offset, offset + 1, ...
+
+        Returns:
+            the distribution over these weights
+        """
+        return cls({offset + i: weight for i, weight in enumerate(weights) if weight})
+
+    @classmethod
+    def constant(cls, value: int) -> "Distribution":
+        """
+        a distribution that always produces the same value
+
+        Args:
+            value: the only possible total
+
+        Returns:
+            a distribution with all of its weight on value
+        """
+        return cls({value: 1})
+
+    def __str__(self) -> str:
+        """
+        dunder str method
+
+        Returns:
+            the string representation of this distribution
+        """
+        return f"<Distribution[{self.min}..{self.max}] mean={self.mean:.4f}>"
+
+    def __repr__(self) -> str:
+        """
+        dunder repr method
+
+        Returns:
+            the repr representation of this distribution
+        """
+        return self.__str__()
+
+    def __add__(self, other: "Distribution | int") -> "Distribution":
+        """
+        the distribution of the sum of two independent values
+
+        Args:
+            other: another distribution, or a flat bonus
+
+        Returns:
+            the distribution of the sum
+        """
+        if isinstance(other, int):
+            return Distribution.from_list(self.min + other, self.weights)
+        return Distribution.from_list(self.min + other.min, convolve(self.weights, other.weights))
+
+    def __radd__(self, other: int) -> "Distribution":
+        """
+        reflected add, so that sum() and int + distribution work
+
+        Args:
+            other: a flat bonus
+
+        Returns:
+            the distribution of the sum
+        """
+        return self + other
+
+    def repeat(self, count: int) -> "Distribution":
+        """
+        the distribution of the sum of count independent draws from this distribution
+
+        uses exponentiation by squaring, so only log2(count) convolutions are needed
+
+        Args:
+            count: the number of independent draws to sum
+
+        Returns:
+            the distribution of the sum
+        """
+        result = Distribution.constant(0)
+        base = self
+        while count > 0:
+            if count & 1:
+                result += base
+            count >>= 1
+            if count:
+                base += base
+        return result
+
+    def keep(self, count: int, keep: int, highest: bool = True) -> "Distribution":
+        """
+        the distribution of the sum of the keep highest (or lowest) of count independent draws
+
+        walks the outcomes from best to worst, tracking how many draws have been
+        placed and the sum of the ones kept so far (order statistics)
+
+        Args:
+            count: the number of independent draws
+            keep: the number of draws to keep
+            highest: if we keep the highest draws, otherwise the lowest
+
+        Returns:
+            the distribution of the kept sum
+        """
+        outcomes = [(t, w) for t, w in self._items() if w]
+        if highest:
+            outcomes.reverse()
+        states: dict[tuple[int, int], int] = {(0, 0): 1}
+        for total, weight in outcomes:
+            powers = [1]
+            for _ in range(count):
+                powers.append(powers[-1] * weight)
+            next_states: dict[tuple[int, int], int] = {}
+            for (placed, kept_sum), state_weight in states.items():
+                remaining = count - placed
+                for same in range(remaining + 1):
+                    kept = min(same, max(keep - placed, 0))
+                    key = (placed + same, kept_sum + kept * total)
+                    ways = math.comb(remaining, same) * powers[same] * state_weight
+                    next_states[key] = next_states.get(key, 0) + ways
+            states = next_states
+        return Distribution({s: w for (placed, s), w in states.items() if placed == count})
+
+    @property
+    def probabilities(self) -> dict[int, float]:
+        """
+        the probability of every possible total
+
+        Returns:
+            a dict of total -> probability
+        """
+        return {
+            self.min + i: weight / self.total for i, weight in enumerate(self.weights) if weight
+        }
+
+    @property
+    def mean(self) -> float:
+        """
+        the expected value of this distribution
+
+        Returns:
+            the mean
+        """
+        return sum(total * weight for total, weight in self._items()) / self.total
+
+    @property
+    def variance(self) -> float:
+        """
+        the variance of this distribution
+
+        Returns:
+            the variance
+        """
+        first = sum(total * weight for total, weight in self._items())
+        second = sum(total * total * weight for total, weight in self._items())
+        return (self.total * second - first * first) / (self.total * self.total)
+
+    @property
+    def stddev(self) -> float:
+        """
+        the standard deviation of this distribution
+
+        Returns:
+            the standard deviation
+        """
+        return math.sqrt(self.variance)
+
+    def _items(self) -> Iterator[tuple[int, int]]:
+        """
+        helper to iterate over (total, weight) pairs
+
+        Returns:
+            an iterator of (total, weight) tuples
+        """
+        return zip(itertools.count(self.min), self.weights)
+
+    def pmf(self, value: int) -> float:
+        """
+        probability mass function
+
+        Args:
+            value: the total to get the probability of
+
+        Returns:
+            the probability of exactly this total
+        """
+        if not self.min <= value <= self.max:
+            return 0.0
+        return self.weights[value - self.min] / self.total
+
+    def cdf(self, value: int) -> float:
+        """
+        cumulative distribution function
+
+        Args:
+            value: the total to get the cumulative probability of
+
+        Returns:
+            the probability of a total less than or equal to value
+        """
+        if value < self.min:
+            return 0.0
+        if value >= self.max:
+            return 1.0
+        return self.cumulative[value - self.min] / self.total
+
+    def percentile(self, percent: float) -> int:
+        """
+        the smallest total with a cumulative probability of at least percent
+
+        Args:
+            percent: the percentile to find, from 0-100
+
+        Returns:
+            the total at the given percentile
+        """
+        if percent < 0 or percent > 100:
+            raise GambleException("the percentile must be between 0 and 100")
+        threshold = max(math.ceil(Fraction(percent) * self.total / 100), 1)
+        return self.min + bisect.bisect_left(self.cumulative, threshold)
+
+
+class AliasTable:
+    """
+    walker/vose alias table for constant time sampling from a distribution
+
+    Args:
+        distribution: the distribution to sample from
+    """
+
+    def __init__(self, distribution: Distribution) -> None:
+        self.distribution = distribution
+        self.size = len(distribution.weights)
+        total = distribution.total
+        # keep the scaled weights as exact integers while pairing, so the table is exact
+        scaled = [weight * self.size for weight in distribution.weights]
+        self.probabilities = [1.0] * self.size
+        self.aliases = list(range(self.size))
+        small = [i for i, weight in enumerate(scaled) if weight < total]
+        large = [i for i, weight in enumerate(scaled) if weight >= total]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.probabilities[less] = scaled[less] / total
+            self.aliases[less] = more
+            scaled[more] -= total - scaled[less]
+            (small if scaled[more] < total else large).append(more)
+
+    def sample(self, rng: random.Random | None = None) -> int:
+        """
+        draw a single value from the table, with one random number
+
+        Args:
+            rng: the random generator to draw with, defaults to the global random state
+
+        Returns:
+            the sampled total
+        """
+        position = (rng or default_rng()).random() * self.size  # nosec
+        index = int(position)
+        if position - index >= self.probabilities[index]:
+            index = self.aliases[index]
+        return self.distribution.min + index
+
+    def sample_many(self, num_samples: int, rng: random.Random | None = None) -> list[int]:
+        """
+        draw multiple values from the table
+
+        Args:
+            num_samples: the number of values to draw
+            rng: the random generator to draw with, defaults to the global random state
+
+        Returns:
+            a list of the sampled totals
+        """
+        rng = rng or default_rng()
+        return [self.sample(rng) for _ in range(num_samples)]
@@ -0,0 +1,407 @@
+"""
+lookup table poker hand evaluator over integer card codes
+
+cards are encoded as ints from 0-51, suit.value * 13 + value.value - 1 (see Card.code).
+hands are scored as a strength int, higher is better, with the hand category
+(matching Hand.Ranks values) in the high bits and the tie breaking ranks below it
+"""
+
+import functools
+import itertools
+import operator
+import os
+from array import array
+from collections import Counter
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from typing import Protocol
+from gamble.errors import InvalidHand
+
+PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+CATEGORY_SHIFT = 20
+ROYAL_FLUSH = 9
+STRAIGHT_FLUSH = 8
+FOUR_OF_A_KIND = 7
+FULL_HOUSE = 6
+FLUSH = 5
+STRAIGHT = 4
+THREE_OF_A_KIND = 3
+TWO_PAIR = 2
+PAIR = 1
+HIGH_CARD = 0
+
+
+class HasCode(Protocol):
+    """
+    anything with a card code, like a Card
+    """
+
+    code: int
+
+
+class HasCards(Protocol):
+    """
+    anything holding a list of cards, like a Hand
+    """
+
+    cards: list
+
+
+def to_codes(cards: Iterable[int | HasCode] | HasCards) -> list[int]:
+    """
+    convert cards, a hand, or card codes into a list of card codes
+
+    Args:
+        cards: a Hand, or an iterable of Card objects or card codes
+
+    Returns:
+        a list of card codes
+    """
+    items = cards.cards if hasattr(cards, "cards") else cards
+    return [x if isinstance(x, int) else x.code for x in items]
+
+
+def pack(kind: int, ranks: Iterable[int]) -> int:
+    """
+    pack a hand category and its tie breaking ranks into a strength
+
+    Args:
+        kind: the hand category
+        ranks: up to five ranks, most important first
+
+    Returns:
+        the strength
+    """
+    return (kind << CATEGORY_SHIFT) | sum(rank << (4 * (4 - i)) for i, rank in enumerate(ranks))
+
+
+def rank_of(code: int) -> int:
+    """
+    the poker rank of a card code, from 0 (two) to 12 (ace)
+
+    Args:
+        code: the card code
+
+    Returns:
+        the rank of the card, aces high
+    """
+    return (code % 13 + 12) % 13
+
+
+def straight_top(ranks: set[int] | frozenset[int]) -> int:
+    """
+    the top rank of the best straight in a set of ranks
+
+    Args:
+        ranks: a set of ranks, from 0 (two) to 12 (ace)
+
+    Returns:
+        the rank of the highest card in the straight (3 for the wheel), or -1
+    """
+    for top in range(12, 3, -1):
+        if all(top - i in ranks for i in range(5)):
+            return top
+    if {12, 0, 1, 2, 3} <= ranks:
+        return 3
+    return -1
+
+
+def score(ranks: Sequence[int], flush: bool = False) -> int:
+    """
+    score five ranks directly, without any lookup tables
+
+    Args:
+        ranks: the ranks of the five cards, from 0 (two) to 12 (ace)
+        flush: if all five cards share a suit
+
+    Returns:
+        the strength of the hand
+    """
+    counts = Counter(ranks)
+    shape = sorted(counts.values(), reverse=True)
+    ordered = sorted(counts, key=lambda x: (counts[x], x), reverse=True)
+    top = straight_top(frozenset(ranks)) if len(counts) == 5 else -1
+    if top >= 0:
+        ordered = [top]
+    if top >= 0 and flush:
+        kind = ROYAL_FLUSH if top == 12 else STRAIGHT_FLUSH
+    elif shape[0] == 4:
+        kind = FOUR_OF_A_KIND
+    elif shape[:2] == [3, 2]:
+        kind = FULL_HOUSE
+    elif flush:
+        kind = FLUSH
+    elif top >= 0:
+        kind = STRAIGHT
+    elif shape[0] == 3:
+        kind = THREE_OF_A_KIND
+    elif shape[:2] == [2, 2]:
+        kind = TWO_PAIR
+    elif shape[0] == 2:
+        kind = PAIR
+    else:
+        kind = HIGH_CARD
+    return pack(kind, ordered)
+
+
+def category(strength: int) -> int:
+    """
+    the hand category of a strength, matching the Hand.Ranks values
+
+    Args:
+        strength: a hand strength
+
+    Returns:
+        the category, from 0 (high card) to 9 (royal flush)
+    """
+    return strength >> CATEGORY_SHIFT
+
+
+@functools.cache
+def tables() -> tuple[tuple[int, ...], list[int], list[int], dict[int, int]]:
+    """
+    build the lookup tables, once, on first use
+
+    Returns:
+        a tuple of the packed card bits by code, the flush table and unique rank
+        table (both indexed by a 13 bit rank mask), and the prime product table
+    """
+    bits = tuple(
+        (1 << (16 + rank_of(code))) | (1 << (12 + code // 13)) | PRIMES[rank_of(code)]
+        for code in range(52)
+    )
+    flushes = [0] * 8192
+    uniques = [0] * 8192
+    for ranks in itertools.combinations(range(13), 5):
+        mask = sum(1 << x for x in ranks)
+        flushes[mask] = score(ranks, flush=True)
+        uniques[mask] = score(ranks)
+    products = {}
+    for ranks in itertools.combinations_with_replacement(range(13), 5):
+        if len(set(ranks)) < 5 and max(Counter(ranks).values()) < 5:
+            products[functools.reduce(int.__mul__, (PRIMES[x] for x in ranks))] = score(ranks)
+    return bits, flushes, uniques, products
+
+
+def evaluate5(first: int, second: int, third: int, fourth: int, fifth: int) -> int:
+    """
+    evaluate exactly five card codes with the lookup tables
+
+    Args:
+        first: the first card code
+        second: the second card code
+        third: the third card code
+        fourth: the fourth card code
+        fifth: the fifth card code
+
+    Returns:
+        the strength of the hand, the cards are assumed to be distinct (see evaluate)
+    """
+    bits, flushes, uniques, products = tables()
+    a, b, c, d, e = bits[first], bits[second], bits[third], bits[fourth], bits[fifth]
+    mask = (a | b | c | d | e) >> 16
+    if a & b & c & d & e & 0xF000:
+        return flushes[mask]
+    return uniques[mask] or products.get(
+        (a & 0xFF) * (b & 0xFF) * (c & 0xFF) * (d & 0xFF) * (e & 0xFF), 0
+    )
+
+
+@functools.cache
+def seven_tables() -> tuple[tuple[int, ...], list[int], list[int]]:
+    """
+    build the tables for the six and seven card evaluator, once, on first use
+
+    Returns:
+        a tuple of the rank by code, the best straight top by 13 bit rank mask (or
+        -1), and the best flush strength by 13 bit mask of a suit's ranks (or 0)
+    """
+    ranks = tuple(rank_of(code) for code in range(52))
+    straights = [
+        straight_top(frozenset(x for x in range(13) if mask >> x & 1)) for mask in range(8192)
+    ]
+    flushes = [0] * 8192
+    for mask in range(8192):
+        if mask.bit_count() < 5:
+            continue
+        top = straights[mask]
+        if top >= 0:
+            flushes[mask] = pack(ROYAL_FLUSH if top == 12 else STRAIGHT_FLUSH, [top])
+        else:
+            flushes[mask] = pack(FLUSH, [x for x in range(12, -1, -1) if mask >> x & 1][:5])
+    return ranks, straights, flushes
+
+
+def evaluate7(codes: Sequence[int]) -> int:  # noqa: PLR0911, PLR0912
+    """
+    evaluate the best five card hand out of five to seven card codes
+
+    works straight from the rank counts and suit masks instead of trying every
+    five card subset
+
+    Args:
+        codes: five, six or seven card codes
+
+    Returns:
+        the strength of the best five card hand, the cards are assumed to be
+        distinct (see evaluate)
+    """
+    ranks, straights, flushes = seven_tables()
+    counts = [0] * 13
+    suit_masks = [0, 0, 0, 0]
+    for code in codes:
+        rank = ranks[code]
+        counts[rank] += 1
+        suit_masks[code // 13] |= 1 << rank
+    flush = 0
+    for mask in suit_masks:
+        if mask.bit_count() >= 5:
+            flush = flushes[mask]
+            if flush >> CATEGORY_SHIFT >= STRAIGHT_FLUSH:
+                return flush
+    groups: list[list[int]] = [[], [], [], [], []]
+    for rank in range(12, -1, -1):
+        if counts[rank] > 4:
+            return 0
+        groups[counts[rank]].append(rank)
+    _, singles, pairs, trips, quads = groups
+    if quads:
+        return pack(FOUR_OF_A_KIND, [quads[0], max([*quads[1:], *trips, *pairs, *singles])])
+    if trips and (len(trips) > 1 or pairs):
+        return pack(FULL_HOUSE, [trips[0], max([*trips[1:], *pairs])])
+    if flush:
+        return flush
+    top = straights[suit_masks[0] | suit_masks[1] | suit_masks[2] | suit_masks[3]]
+    if top >= 0:
+        return pack(STRAIGHT, [top])
+    if trips:
+        return pack(THREE_OF_A_KIND, [trips[0], *singles[:2]])
+    if len(pairs) > 1:
+        return pack(TWO_PAIR, [pairs[0], pairs[1], max([*pairs[2:], *singles])])
+    if pairs:
+        return pack(PAIR, [pairs[0], *singles[:3]])
+    return pack(HIGH_CARD, singles[:5])
+
+
+def evaluate(cards: Iterable[int | HasCode] | HasCards) -> int:
+    """
+    evaluate a poker hand, taking the best five cards of a six or seven card hand
+
+    Args:
+        cards: a Hand, or five to seven Card objects or card codes
+
+    Returns:
+        the strength of the best five card hand, or 0 if it is not a valid poker hand
+        (the wrong number of cards, or duplicate cards)
+    """
+    codes = to_codes(cards)
+    if len(set(codes)) != len(codes):
+        return 0
+    if len(codes) == 5:
+        return evaluate5(*codes)
+    if 5 < len(codes) <= 7:
+        return evaluate7(codes)
+    return 0
+
+
+def evaluate_many(hands: Iterable[Sequence[int]]) -> list[int]:
+    """
+    evaluate many hands of card codes in bulk
+
+    Args:
+        hands: an iterable of five card code sequences, or six/seven card sequences
+
+    Returns:
+        a list of the strength of each hand
+    """
+    tables()
+    return [evaluate5(*x) if len(x) == 5 else evaluate7(x) for x in hands]
+
+
+def evaluate_array(
+    codes: bytes | bytearray | array | Iterable[Sequence[int]], width: int | None = None
+) -> tuple[array, array]:
+    """
+    evaluate an array of hands, without building any Card or Hand objects
+
+    hands are either rows of card codes (like a list of lists, or a 2d numpy
+    array), or a flat buffer of card codes (like bytes or an array from
+    cards_to_codes) with a row width. rows are sliced off the buffer and
+    evaluated straight from the lookup tables
+
+    Args:
+        codes: the hands, as rows or a flat buffer of card codes
+        width: the number of cards per hand in a flat buffer, 5 to 7
+
+    Returns:
+        a tuple of the category of each hand (unsigned bytes) and the strength of
+        each hand (unsigned ints), 0 for hands with duplicate cards, like evaluate
+    """
+    if width is None:
+        rows = list(codes)
+        width = len(rows[0]) if rows else 5
+        flat = array("B", itertools.chain.from_iterable(rows))
+    else:
+        flat = array("B", codes)
+    if not 5 <= width <= 7 or len(flat) % width:
+        raise InvalidHand(f"hands must be rows of 5 to 7 card codes, not {width}")
+    hands = zip(*[iter(flat)] * width, strict=True)
+    tables()
+    if width == 5:
+        strengths = array("I", (evaluate5(*x) if len(set(x)) == 5 else 0 for x in hands))
+    else:
+        strengths = array("I", (evaluate7(x) if len(set(x)) == width else 0 for x in hands))
+    categories = array("B", map(operator.rshift, strengths, itertools.repeat(CATEGORY_SHIFT)))
+    return categories, strengths
+
+
+def count_categories(first: int, deck: Sequence[int], size: int) -> Counter:
+    """
+    count the categories of every hand whose first card is deck[first]
+
+    Args:
+        first: the index in deck of the lowest card in every hand
+        deck: the card codes to deal from
+        size: the number of cards in a hand
+
+    Returns:
+        a counter of category -> number of hands
+    """
+    evaluator = evaluate7 if size > 5 else lambda x: evaluate5(*x)
+    head = deck[first]
+    return Counter(
+        evaluator((head, *rest)) >> CATEGORY_SHIFT
+        for rest in itertools.combinations(deck[first + 1 :], size - 1)
+    )
+
+
+def evaluate_all(
+    size: int = 7, deck: Sequence[int] = tuple(range(52)), workers: int | None = None
+) -> Counter:
+    """
+    evaluate every hand of a given size that can be dealt from a deck, across processes
+
+    the hands are sharded by their lowest card, and each worker counts categories
+
+    Args:
+        size: the number of cards in a hand, from 5 to 7
+        deck: the card codes to deal from, defaults to the full deck
+        workers: the number of processes to use, defaults to the cpu count
+
+    Returns:
+        a counter of category -> number of hands
+    """
+    deck = tuple(deck)
+    shards = range(len(deck) - size + 1)
+    result: Counter = Counter()
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for first in shards:
+            result.update(count_categories(first, deck, size))
+        return result
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for counts in executor.map(
+            count_categories, shards, itertools.repeat(deck), itertools.repeat(size)
+        ):
+            result.update(counts)
+    return result
@@ -0,0 +1,1038 @@
+"""
+texas hold'em equity calculations, built on the lookup table evaluator
+"""
+
+import bisect
+import copy
+import itertools
+import json
+import math
+import os
+import re
+import sqlite3
+from collections import OrderedDict
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from statistics import NormalDist
+from typing import Any
+from gamble.errors import InvalidHand, InvalidRange
+from gamble.models.cards import Card
+from gamble.models.evaluator import HasCards, HasCode, evaluate7, rank_of, to_codes
+from gamble.rng import SeedSequence
+
+CardsLike = str | Iterable[int | HasCode] | HasCards
+RANK_CHARS = "23456789TJQKA"
+SUIT_PERMUTATIONS = tuple(itertools.permutations(x.value for x in Card.Suits.all()))
+RANGE_TERM = re.compile(
+    r"^(?P<high>[2-9TJQKA])(?P<low>[2-9TJQKA])(?P<kind>[SO])?"
+    r"(?:(?P<plus>\+)|-(?P<to_high>[2-9TJQKA])(?P<to_low>[2-9TJQKA])(?P=kind)?)?$"
+)
+RANGE_COMBO = re.compile(r"^[2-9TJQKA][SCDH][2-9TJQKA][SCDH]$")
+RANGE_TOP = re.compile(r"^TOP(?P<percent>\d+(?:\.\d+)?)%$")
+WeightedCombo = tuple[tuple[Card, Card], float]
+
+
+def parse_cards(cards: CardsLike) -> list[int]:
+    """
+    convert a card string, a hand, or cards into a list of card codes
+
+    Args:
+        cards: a string like "AsKs" or "As,Ks", a Hand, or Card objects or card codes
+
+    Returns:
+        a list of card codes
+    """
+    if isinstance(cards, str):
+        text = cards.replace(",", "").replace(" ", "")
+        return [Card.get(text[i : i + 2]).code for i in range(0, len(text), 2)]
+    return to_codes(cards)
+
+
+@dataclass
+class EquityResult:
+    """
+    the result of an equity calculation, per player
+
+    Args:
+        wins: the number of boards each player won outright
+        ties: the number of boards each player split
+        shares: the total pot share each player won
+        squares: the sum of the squared pot shares, for the standard error
+        trials: the number of boards dealt
+        exact: if every possible board was enumerated
+    """
+
+    wins: list[int]
+    ties: list[int]
+    shares: list[float]
+    squares: list[float]
+    trials: int = 0
+    exact: bool = False
+
+    @classmethod
+    def empty(cls, players: int, exact: bool = False) -> "EquityResult":
+        """
+        create an empty result
+
+        Args:
+            players: the number of players
+            exact: if the result will be exhaustive
+
+        Returns:
+            a result with no boards in it
+        """
+        return cls([0] * players, [0] * players, [0.0] * players, [0.0] * players, 0, exact)
+
+    def __str__(self) -> str:
+        """
+        dunder str method
+
+        Returns:
+            the string representation of this result
+        """
+        shares = ", ".join(f"{x:.4f}" for x in self.equity)
+        return f"<EquityResult[{self.trials}] equity=[{shares}]>"
+
+    def merge(self, other: "EquityResult") -> "EquityResult":
+        """
+        merge another result into this one
+
+        Args:
+            other: the result to merge in, for the same players
+
+        Returns:
+            this result, for chaining
+        """
+        for i in range(len(self.wins)):
+            self.wins[i] += other.wins[i]
+            self.ties[i] += other.ties[i]
+            self.shares[i] += other.shares[i]
+            self.squares[i] += other.squares[i]
+        self.trials += other.trials
+        return self
+
+    def showdown(self, strengths: Sequence[int]) -> None:
+        """
+        record the showdown of one board
+
+        Args:
+            strengths: the strength of each player's best hand on this board
+        """
+        best = max(strengths)
+        winners = [i for i, x in enumerate(strengths) if x == best]
+        self.trials += 1
+        if len(winners) == 1:
+            self.wins[winners[0]] += 1
+            self.shares[winners[0]] += 1.0
+            self.squares[winners[0]] += 1.0
+            return
+        share = 1.0 / len(winners)
+        for i in winners:
+            self.ties[i] += 1
+            self.shares[i] += share
+            self.squares[i] += share * share
+
+    @property
+    def win(self) -> list[float]:
+        """
+        the chance of each player winning outright
+
+        Returns:
+            a list of win rates
+        """
+        return [x / self.trials for x in self.wins]
+
+    @property
+    def tie(self) -> list[float]:
+        """
+        the chance of each player splitting the pot
+
+        Returns:
+            a list of tie rates
+        """
+        return [x / self.trials for x in self.ties]
+
+    @property
+    def equity(self) -> list[float]:
+        """
+        the expected share of the pot for each player
+
+        Returns:
+            a list of equities, summing to 1
+        """
+        return [x / self.trials for x in self.shares]
+
+    @property
+    def stderr(self) -> list[float]:
+        """
+        the standard error of each player's equity, 0 for an exact result
+
+        Returns:
+            a list of standard errors
+        """
+        if self.exact or self.trials < 2:
+            return [0.0] * len(self.shares)
+        return [
+            math.sqrt(max(square / self.trials - (share / self.trials) ** 2, 0.0) / self.trials)
+            for share, square in zip(self.shares, self.squares, strict=True)
+        ]
+
+
+@dataclass
+class Deal:
+    """
+    the known cards of an equity calculation
+
+    Args:
+        players: the hole card codes of each player
+        board: the board card codes
+        remaining: the codes of every card that can still be dealt
+    """
+
+    players: list[list[int]]
+    board: list[int]
+    remaining: list[int] = field(default_factory=list)
+
+    @property
+    def missing(self) -> int:
+        """
+        the number of board cards still to come
+
+        Returns:
+            cards to deal
+        """
+        return 5 - len(self.board)
+
+    def showdown(self, result: EquityResult, runout: Sequence[int]) -> None:
+        """
+        evaluate every player on a complete board and record it
+
+        Args:
+            result: the result to record the showdown in
+            runout: the board cards dealt after the known board
+        """
+        board = (*self.board, *runout)
+        result.showdown([evaluate7((*hole, *board)) for hole in self.players])
+
+
+def create_deal(players: Sequence[CardsLike], board: CardsLike = (), dead: CardsLike = ()) -> Deal:
+    """
+    validate and encode the known cards of an equity calculation
+
+    Args:
+        players: the hole cards of each player
+        board: the known board cards, up to 5
+        dead: any other cards known to be out of the deck
+
+    Returns:
+        the deal, with the remaining cards to deal from
+    """
+    holes = [parse_cards(x) for x in players]
+    board_codes = parse_cards(board)
+    known = [*itertools.chain.from_iterable(holes), *board_codes, *parse_cards(dead)]
+    if len(holes) < 2:
+        raise InvalidHand("equity needs at least two players")
+    if any(not x for x in holes):
+        raise InvalidHand("every player needs hole cards")
+    if len(board_codes) > 5:
+        raise InvalidHand("the board can't have more than five cards")
+    if len(set(known)) != len(known):
+        raise InvalidHand("the same card can't be dealt twice")
+    used = set(known)
+    remaining = [x for x in range(52) if x not in used]
+    if len(remaining) < 5 - len(board_codes):
+        raise InvalidHand("not enough cards left to deal the board")
+    return Deal(holes, board_codes, remaining)
+
+
+def run_exact(deal: Deal, first: int) -> EquityResult:
+    """
+    enumerate every runout whose first card is deal.remaining[first]
+
+    Args:
+        deal: the known cards
+        first: the index of the lowest card of the runouts in deal.remaining
+
+    Returns:
+        the exact result for these runouts
+    """
+    result = EquityResult.empty(len(deal.players), exact=True)
+    if not deal.missing:
+        deal.showdown(result, ())
+        return result
+    head = deal.remaining[first]
+    for rest in itertools.combinations(deal.remaining[first + 1 :], deal.missing - 1):
+        deal.showdown(result, (head, *rest))
+    return result
+
+
+def run_sample(deal: Deal, trials: int, seed: SeedSequence) -> EquityResult:
+    """
+    deal random runouts with a shard's own generator
+
+    Args:
+        deal: the known cards
+        trials: the number of runouts to deal
+        seed: the seed sequence for this shard's generator
+
+    Returns:
+        the sampled result
+    """
+    rng = seed.rng()
+    result = EquityResult.empty(len(deal.players))
+    for _ in range(trials):
+        deal.showdown(result, rng.sample(deal.remaining, deal.missing))
+    return result
+
+
+def equity(  # noqa: PLR0913, PLR0917
+    players: Sequence[CardsLike],
+    board: CardsLike = (),
+    dead: CardsLike = (),
+    exhaustive_limit: int = 50_000,
+    margin: float = 0.005,
+    confidence: float = 0.95,
+    max_trials: int = 1_000_000,
+    batch_size: int = 10_000,
+    seed: int | None = None,
+    workers: int | None = None,
+) -> EquityResult:
+    """
+    calculate the hold'em equity of each player, across a process pool
+
+    if there are at most exhaustive_limit possible runouts, every one is
+    enumerated. otherwise runouts are sampled in rounds of one batch per worker
+    until the confidence interval of every player's equity is within margin,
+    or max_trials is reached
+
+    Args:
+        players: the hole cards of each player, as strings like "AsKs", Hands or cards
+        board: the known board cards, up to 5
+        dead: any other cards known to be out of the deck
+        exhaustive_limit: the max number of runouts to enumerate exactly
+        margin: the half width of the confidence interval to stop sampling at
+        confidence: the confidence level of the interval
+        max_trials: the max number of runouts to sample
+        batch_size: the number of runouts per shard
+        seed: the root seed for sampling, or None for a random one
+        workers: the number of processes to use, defaults to the cpu count
+
+    Returns:
+        the win, tie and equity of each player
+    """
+    deal = create_deal(players, board, dead)
+    workers = workers or os.cpu_count() or 1
+    if math.comb(len(deal.remaining), deal.missing) <= exhaustive_limit:
+        shards = range(len(deal.remaining) - deal.missing + 1 if deal.missing else 1)
+        result = EquityResult.empty(len(deal.players), exact=True)
+        if workers == 1:
+            for first in shards:
+                result.merge(run_exact(deal, first))
+            return result
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for shard in executor.map(run_exact, itertools.repeat(deal), shards):
+                result.merge(shard)
+        return result
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    seeds = SeedSequence(seed)
+    result = EquityResult.empty(len(deal.players))
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        while result.trials < max_trials:
+            size = min(batch_size, -(-(max_trials - result.trials) // workers))
+            jobs = [(deal, size, x) for x in seeds.spawn(workers)]
+            if pool:
+                futures = [pool.submit(run_sample, *job) for job in jobs]
+                for future in futures:
+                    result.merge(future.result())
+            else:
+                for job in jobs:
+                    result.merge(run_sample(*job))
+            if max(result.stderr) * z <= margin:
+                break
+    finally:
+        if pool:
+            pool.shutdown()
+    return result
+
+
+def canonicalize(
+    players: Sequence[CardsLike], board: CardsLike = (), dead: CardsLike = ()
+) -> tuple[tuple[int, ...], ...]:
+    """
+    map a deal to its canonical form under suit relabeling
+
+    every deal that only differs by a permutation of Card.Suits (and by the order
+    of cards within a player, the board or the dead cards) has the same canonical
+    form, so they share an equity. the player order is kept
+
+    Args:
+        players: the hole cards of each player
+        board: the known board cards
+        dead: any other cards known to be out of the deck
+
+    Returns:
+        a tuple of each player's sorted codes, then the sorted board and dead codes
+    """
+    groups = [*(parse_cards(x) for x in players), parse_cards(board), parse_cards(dead)]
+    return min(
+        tuple(tuple(sorted(perm[x // 13] * 13 + x % 13 for x in group)) for group in groups)
+        for perm in SUIT_PERMUTATIONS
+    )
+
+
+class EquityCache:
+    """
+    a cache of equity results keyed by the canonical form of a deal
+
+    exact results are keyed by the deal alone, and answer any query for it.
+    sampled results are also keyed by the equity arguments, so a cheap estimate
+    is never returned for a query that asked for more. recent results are kept
+    in an in memory lru, and every result is written through to a sqlite
+    database if a path is given, so it survives restarts. every caller gets its
+    own copy of a result
+
+    Args:
+        path: the sqlite database file, or None to only cache in memory
+        size: the max number of results to keep in memory
+    """
+
+    def __init__(self, path: str | None = None, size: int = 4096) -> None:
+        self.path = path
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._memory: OrderedDict[str, EquityResult] = OrderedDict()
+        self._db = sqlite3.connect(path) if path else None
+        if self._db:
+            self._db.execute("CREATE TABLE IF NOT EXISTS equity (key TEXT PRIMARY KEY, value TEXT)")
+
+    def __str__(self) -> str:
+        """
+        dunder str method
+
+        Returns:
+            the string representation of this cache
+        """
+        return f"<EquityCache[{len(self._memory)}] hits={self.hits} misses={self.misses}>"
+
+    def __repr__(self) -> str:
+        """
+        dunder repr method
+
+        Returns:
+            the repr representation of this cache
+        """
+        return self.__str__()
+
+    @staticmethod
+    def key(canonical: tuple[tuple[int, ...], ...]) -> str:
+        """
+        the text key for a canonical deal
+
+        Args:
+            canonical: a canonical deal, see canonicalize
+
+        Returns:
+            the key, groups of codes separated by |
+        """
+        return "|".join(".".join(str(x) for x in group) for group in canonical)
+
+    @staticmethod
+    def sampled_key(key: str, **kwargs: Any) -> str:
+        """
+        the text key for a sampled result, which depends on how it was sampled
+
+        Args:
+            key: the key of a canonical deal
+            **kwargs: the arguments passed to equity
+
+        Returns:
+            the key, with the arguments appended after a ?
+        """
+        return f"{key}?{json.dumps(kwargs, sort_keys=True)}"
+
+    def get(self, key: str) -> EquityResult | None:
+        """
+        look up a result, from memory first and then from disk
+
+        Args:
+            key: the key of a result
+
+        Returns:
+            a copy of the cached result, or None
+        """
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return copy.deepcopy(self._memory[key])
+        if not self._db:
+            return None
+        row = self._db.execute("SELECT value FROM equity WHERE key = ?", (key,)).fetchone()
+        if not row:
+            return None
+        result = EquityResult(**json.loads(row[0]))
+        self._remember(key, copy.deepcopy(result))
+        return result
+
+    def put(self, key: str, result: EquityResult) -> None:
+        """
+        store a copy of a result in memory, and the result on disk
+
+        Args:
+            key: the key of a result
+            result: the result to store
+        """
+        self._remember(key, copy.deepcopy(result))
+        if self._db:
+            with self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO equity VALUES (?, ?)", (key, json.dumps(asdict(result)))
+                )
+
+    def _remember(self, key: str, result: EquityResult) -> None:
+        """
+        store a result in the in memory lru, evicting the oldest if it is full
+
+        Args:
+            key: the key of a result
+            result: the result to store
+        """
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.size:
+            self._memory.popitem(last=False)
+
+    def equity(
+        self,
+        players: Sequence[CardsLike],
+        board: CardsLike = (),
+        dead: CardsLike = (),
+        **kwargs: Any,
+    ) -> EquityResult:
+        """
+        the equity of a deal, calculated only if no equivalent deal is cached
+
+        Args:
+            players: the hole cards of each player
+            board: the known board cards
+            dead: any other cards known to be out of the deck
+            **kwargs: passed to equity on a miss
+
+        Returns:
+            the win, tie and equity of each player
+        """
+        canonical = canonicalize(players, board, dead)
+        key = self.key(canonical)
+        sampled = self.sampled_key(key, **kwargs)
+        result = self.get(key) or self.get(sampled)
+        if result:
+            self.hits += 1
+            return result
+        self.misses += 1
+        *holes, board_codes, dead_codes = canonical
+        result = equity(holes, board_codes, dead_codes, **kwargs)
+        self.put(key if result.exact else sampled, result)
+        return result
+
+    def close(self) -> None:
+        """
+        close the sqlite database, if there is one
+        """
+        if self._db:
+            self._db.close()
+            self._db = None
+
+
+def code_of(rank: int, suit: int) -> int:
+    """
+    the card code of a poker rank and a suit
+
+    Args:
+        rank: the poker rank, from 0 (two) to 12 (ace)
+        suit: the suit value
+
+    Returns:
+        the card code
+    """
+    return suit * 13 + (rank + 1) % 13
+
+
+def preflop_classes() -> list[str]:
+    """
+    the 169 strategically distinct starting hands, like AA, AKs and AKo
+
+    Returns:
+        a list of class names, pairs first and then from the highest cards down
+    """
+    pairs = [RANK_CHARS[x] * 2 for x in range(12, -1, -1)]
+    unpaired = [
+        f"{RANK_CHARS[high]}{RANK_CHARS[low]}{kind}"
+        for high in range(12, -1, -1)
+        for low in range(high - 1, -1, -1)
+        for kind in "so"
+    ]
+    return pairs + unpaired
+
+
+def class_combos(name: str) -> list[tuple[int, int]]:
+    """
+    every pair of hole card codes in a preflop class
+
+    Args:
+        name: a class name, like AA, AKs or AKo
+
+    Returns:
+        a list of hole card code pairs, 6 for a pair, 4 suited or 12 offsuit
+    """
+    high, low = RANK_CHARS.index(name[0].upper()), RANK_CHARS.index(name[1].upper())
+    suits = [x.value for x in Card.Suits.all()]
+    if high == low:
+        return [(code_of(high, a), code_of(low, b)) for a, b in itertools.combinations(suits, 2)]
+    if name[2:].lower() == "s":
+        return [(code_of(high, x), code_of(low, x)) for x in suits]
+    return [(code_of(high, a), code_of(low, b)) for a in suits for b in suits if a != b]
+
+
+def class_equity(first: str, second: str, cache: EquityCache | None = None, **kwargs: Any) -> float:
+    """
+    the preflop equity of one class against another, over every combo matchup
+
+    combos that share a card are skipped, and the rest collapse to a handful of
+    canonical deals, so each one is only calculated once
+
+    Args:
+        first: the class name of the first player
+        second: the class name of the second player
+        cache: the cache to use, a new in memory cache if not given
+        **kwargs: passed to equity on a cache miss
+
+    Returns:
+        the equity of the first class
+    """
+    cache = cache or EquityCache()
+    total = 0.0
+    matchups = 0
+    for a, b in itertools.product(class_combos(first), class_combos(second)):
+        if set(a) & set(b):
+            continue
+        total += cache.equity([a, b], **kwargs).equity[0]
+        matchups += 1
+    return total / matchups
+
+
+def preflop_matrix(
+    classes: Sequence[str] | None = None,
+    cache: EquityCache | None = None,
+    **kwargs: Any,
+) -> dict[tuple[str, str], float]:
+    """
+    the heads up preflop equity of every class against every other class
+
+    with a disk backed cache this only has to be calculated once
+
+    Args:
+        classes: the class names to include, defaults to all 169
+        cache: the cache to use, a new in memory cache if not given
+        **kwargs: passed to equity on a cache miss
+
+    Returns:
+        a dict of (class, opponent class) -> equity of the first class
+    """
+    cache = cache or EquityCache()
+    names = list(classes or preflop_classes())
+    matrix: dict[tuple[str, str], float] = {}
+    for first, second in itertools.combinations_with_replacement(names, 2):
+        matrix[first, second] = class_equity(first, second, cache, **kwargs)
+        if first != second:
+            matrix[second, first] = 1.0 - matrix[first, second]
+    return matrix
+
+
+def chen(name: str) -> int:
+    """
+    the chen formula score of a preflop class, higher is stronger
+
+    Args:
+        name: a class name, like AA, AKs or AKo
+
+    Returns:
+        the rounded up chen score
+    """
+    high, low = RANK_CHARS.index(name[0].upper()), RANK_CHARS.index(name[1].upper())
+    points = {12: 10.0, 11: 8.0, 10: 7.0, 9: 6.0}.get(high, (high + 2) / 2)
+    if high == low:
+        return math.ceil(max(points * 2, 5))
+    gap = high - low - 1
+    points -= (0, 1, 2, 4)[gap] if gap < 4 else 5
+    if name[2:].lower() == "s":
+        points += 2
+    if gap < 2 and high < 10:
+        points += 1
+    return math.ceil(points)
+
+
+def top_classes(percent: float) -> list[str]:
+    """
+    the strongest preflop classes by the chen formula, covering a share of all combos
+
+    Args:
+        percent: the share of the 1326 starting combos to cover, from 0 to 100
+
+    Returns:
+        the class names, strongest first
+    """
+    ranked = sorted(preflop_classes(), key=chen, reverse=True)
+    target = 1326 * percent / 100
+    classes: list[str] = []
+    covered = 0
+    for name in ranked:
+        if covered >= target:
+            break
+        classes.append(name)
+        covered += len(class_combos(name))
+    return classes
+
+
+def range_classes(match: re.Match) -> list[str]:
+    """
+    the preflop classes of one range term, like QQ+, A2s+, KTo-KQo or AK
+
+    Args:
+        match: a RANGE_TERM match
+
+    Returns:
+        the class names in the term
+    """
+    high, low = RANK_CHARS.index(match["high"]), RANK_CHARS.index(match["low"])
+    kinds = [match["kind"].lower()] if match["kind"] else ["s", "o"]
+    if high < low:
+        high, low = low, high
+    if high == low:
+        if match["kind"]:
+            raise InvalidRange(f"pairs can't be suited or offsuit: {match.string}")
+        top = 12 if match["plus"] else high
+        if match["to_high"]:
+            top = RANK_CHARS.index(match["to_high"])
+        return [RANK_CHARS[x] * 2 for x in range(min(low, top), max(low, top) + 1)]
+    top = high - 1 if match["plus"] else low
+    if match["to_high"]:
+        if RANK_CHARS.index(match["to_high"]) != high:
+            raise InvalidRange(f"a range must keep its high card: {match.string}")
+        top = RANK_CHARS.index(match["to_low"])
+    return [
+        f"{RANK_CHARS[high]}{RANK_CHARS[x]}{kind}"
+        for x in range(min(low, top), max(low, top) + 1)
+        for kind in kinds
+    ]
+
+
+def parse_range(text: str, dead: CardsLike = ()) -> list[WeightedCombo]:
+    """
+    parse a hand range into weighted combos of hole cards
+
+    terms are separated by commas, and can be classes (AA, AKs, AKo, AK), plus
+    ranges (QQ+, A2s+), dash ranges (22-55, KTo-KQo), exact combos (AsKs) or
+    the strongest share of hands by the chen formula (top 15%). any term can
+    take a weight, like AKs:0.5, and a later term overrides an earlier one.
+    combos holding a dead card (like the board) are removed
+
+    Args:
+        text: the hand range
+        dead: the cards blocked from the range
+
+    Returns:
+        a list of ((card, card), weight) in class_combos order, the higher card first
+    """
+    blocked = set(parse_cards(dead))
+    weights: dict[tuple[int, int], float] = {}
+    for term in filter(None, text.upper().replace(" ", "").split(",")):
+        notation, _, weight_text = term.partition(":")
+        try:
+            weight = float(weight_text) if weight_text else 1.0
+        except ValueError as error:
+            raise InvalidRange(f"invalid weight: {term}") from error
+        combos: list[tuple[int, int]] = []
+        if match := RANGE_TOP.match(notation):
+            names = top_classes(float(match["percent"]))
+        elif match := RANGE_TERM.match(notation):
+            names = range_classes(match)
+        elif RANGE_COMBO.match(notation):
+            names = []
+            first, second = sorted(parse_cards(notation), key=lambda x: (-rank_of(x), x))
+            if first == second:
+                raise InvalidRange(f"a combo can't hold the same card twice: {term}")
+            combos.append((first, second))
+        else:
+            raise InvalidRange(f"invalid range term: {term}")
+        for name in names:
+            combos.extend(class_combos(name))
+        for combo in combos:
+            weights[combo] = weight
+    return [
+        ((Card.from_code(a), Card.from_code(b)), weight)
+        for (a, b), weight in weights.items()
+        if weight > 0 and a not in blocked and b not in blocked
+    ]
+
+
+@dataclass
+class RangeEquity:
+    """
+    the result of a range vs range equity calculation
+
+    Args:
+        combos: the hero combos, as hole card codes
+        weights: the weight of each hero combo
+        shares: the weighted pot share won by each hero combo, over every board
+        totals: the weighted number of matchups of each hero combo, over every board
+        boards: the number of boards dealt
+        exact: if every possible board was enumerated
+    """
+
+    combos: list[tuple[int, int]]
+    weights: list[float]
+    shares: list[float]
+    totals: list[float]
+    boards: int = 0
+    exact: bool = False
+
+    def __str__(self) -> str:
+        """
+        dunder str method
+
+        Returns:
+            the string representation of this result
+        """
+        return f"<RangeEquity[{len(self.combos)} combos, {self.boards} boards] {self.equity:.4f}>"
+
+    def merge(self, other: "RangeEquity") -> "RangeEquity":
+        """
+        merge another result for the same ranges into this one
+
+        Args:
+            other: the result to merge in
+
+        Returns:
+            this result, for chaining
+        """
+        for i in range(len(self.combos)):
+            self.shares[i] += other.shares[i]
+            self.totals[i] += other.totals[i]
+        self.boards += other.boards
+        return self
+
+    @property
+    def equity(self) -> float:
+        """
+        the equity of the hero range against the villain range
+
+        Returns:
+            the expected share of the pot for the hero range
+        """
+        total = sum(w * x for w, x in zip(self.weights, self.totals, strict=True))
+        shares = sum(w * x for w, x in zip(self.weights, self.shares, strict=True))
+        return shares / total if total else 0.0
+
+    @property
+    def combo_equity(self) -> dict[tuple[Card, Card], float]:
+        """
+        the equity of each hero combo against the villain range
+
+        Returns:
+            a dict of (card, card) -> equity, skipping combos that never had a matchup
+        """
+        return {
+            (Card.from_code(a), Card.from_code(b)): share / total
+            for (a, b), share, total in zip(self.combos, self.shares, self.totals, strict=True)
+            if total
+        }
+
+
+def range_boards(
+    hero: list[tuple[tuple[int, int], float]],
+    villain: list[tuple[tuple[int, int], float]],
+    boards: Iterable[Sequence[int]],
+) -> RangeEquity:
+    """
+    accumulate range vs range showdowns over a set of complete boards
+
+    each board evaluates every live combo once, then each hero combo is scored
+    against the whole villain range with a bisect into the villain strengths,
+    less the villain combos it blocks (found the same way, per card)
+
+    Args:
+        hero: the hero combos and weights, as card codes
+        villain: the villain combos and weights, as card codes
+        boards: the complete five card boards
+
+    Returns:
+        the result over these boards
+    """
+    result = RangeEquity(
+        [x for x, _ in hero], [w for _, w in hero], [0.0] * len(hero), [0.0] * len(hero)
+    )
+    for board in boards:
+        used = set(board)
+        live = sorted(
+            (evaluate7((*combo, *board)), weight, combo)
+            for combo, weight in villain
+            if combo[0] not in used and combo[1] not in used
+        )
+        strengths = [x[0] for x in live]
+        cumulative = [0.0, *itertools.accumulate(x[1] for x in live)]
+        by_card: dict[int, tuple[list[int], list[float]]] = {}
+        for card in {x for _, _, combo in live for x in combo}:
+            holding = [(x, w) for x, w, combo in live if card in combo]
+            by_card[card] = (
+                [x for x, _ in holding],
+                [0.0, *itertools.accumulate(w for _, w in holding)],
+            )
+        # the same combo can be held by both players, in either card order
+        live_weights = {tuple(sorted(combo)): weight for _, weight, combo in live}
+        result.boards += 1
+        for i, (combo, _) in enumerate(hero):
+            if combo[0] in used or combo[1] in used:
+                continue
+            strength = evaluate7((*combo, *board))
+            low = bisect.bisect_left(strengths, strength)
+            high = bisect.bisect_right(strengths, strength)
+            win, tie, total = cumulative[low], cumulative[high] - cumulative[low], cumulative[-1]
+            for card in combo:
+                if card not in by_card:
+                    continue
+                card_strengths, card_cumulative = by_card[card]
+                card_low = bisect.bisect_left(card_strengths, strength)
+                card_high = bisect.bisect_right(card_strengths, strength)
+                win -= card_cumulative[card_low]
+                tie -= card_cumulative[card_high] - card_cumulative[card_low]
+                total -= card_cumulative[-1]
+            if (weight := live_weights.get(tuple(sorted(combo)))) is not None:
+                total += weight
+                tie += weight
+            result.shares[i] += win + tie / 2
+            result.totals[i] += total
+    return result
+
+
+def sample_boards(
+    board: Sequence[int], remaining: Sequence[int], count: int, seed: SeedSequence
+) -> list[tuple[int, ...]]:
+    """
+    deal random runouts of a board with a shard's own generator
+
+    Args:
+        board: the known board cards
+        remaining: the cards that can still be dealt
+        count: the number of boards to deal
+        seed: the seed sequence for this shard's generator
+
+    Returns:
+        a list of complete boards
+    """
+    rng = seed.rng()
+    return [(*board, *rng.sample(remaining, 5 - len(board))) for _ in range(count)]
+
+
+def range_shard(
+    hero: list[tuple[tuple[int, int], float]],
+    villain: list[tuple[tuple[int, int], float]],
+    board: Sequence[int],
+    remaining: Sequence[int],
+    job: int | tuple[int, SeedSequence],
+) -> RangeEquity:
+    """
+    run one shard of a range vs range calculation
+
+    Args:
+        hero: the hero combos and weights, as card codes
+        villain: the villain combos and weights, as card codes
+        board: the known board cards
+        remaining: the cards that can still be dealt
+        job: the index of the lowest runout card to enumerate, or a number of boards
+            to sample and a seed
+
+    Returns:
+        the result for this shard
+    """
+    if isinstance(job, tuple):
+        return range_boards(hero, villain, sample_boards(board, remaining, *job))
+    missing = 5 - len(board)
+    if not missing:
+        return range_boards(hero, villain, [tuple(board)])
+    head = remaining[job]
+    runouts = itertools.combinations(remaining[job + 1 :], missing - 1)
+    return range_boards(hero, villain, ((*board, head, *rest) for rest in runouts))
+
+
+def range_equity(  # noqa: PLR0913, PLR0917
+    hero: str | Sequence[WeightedCombo],
+    villain: str | Sequence[WeightedCombo],
+    board: CardsLike = (),
+    dead: CardsLike = (),
+    exhaustive_limit: int = 2_000,
+    boards: int = 2_000,
+    seed: int | None = None,
+    workers: int | None = None,
+) -> RangeEquity:
+    """
+    calculate the equity of one hand range against another, across a process pool
+
+    every board is evaluated once for all combos in both ranges, instead of once
+    per matchup. if there are at most exhaustive_limit possible runouts, every one
+    is enumerated, otherwise boards are sampled, split evenly over the workers
+
+    Args:
+        hero: the hero range, as text or weighted combos from parse_range
+        villain: the villain range, as text or weighted combos from parse_range
+        board: the known board cards, up to 5
+        dead: any other cards known to be out of the deck
+        exhaustive_limit: the max number of runouts to enumerate exactly
+        boards: the number of boards to sample otherwise
+        seed: the root seed for sampling, or None for a random one
+        workers: the number of processes to use, defaults to the cpu count
+
+    Returns:
+        the equity of the hero range, and of each hero combo
+    """
+    board_codes = parse_cards(board)
+    blocked = [*board_codes, *parse_cards(dead)]
+    if len(board_codes) > 5:
+        raise InvalidHand("the board can't have more than five cards")
+    if len(set(blocked)) != len(blocked):
+        raise InvalidHand("the same card can't be dealt twice")
+    hero_codes, villain_codes = (
+        [
+            ((first.code, second.code), weight)
+            for (first, second), weight in (parse_range(x, blocked) if isinstance(x, str) else x)
+            if first.code not in blocked and second.code not in blocked
+        ]
+        for x in (hero, villain)
+    )
+    remaining = [x for x in range(52) if x not in set(blocked)]
+    missing = 5 - len(board_codes)
+    workers = workers or os.cpu_count() or 1
+    jobs: list[int | tuple[int, SeedSequence]]
+    exact = math.comb(len(remaining), missing) <= exhaustive_limit
+    if exact:
+        jobs = list(range(len(remaining) - missing + 1 if missing else 1))
+    else:
+        shards = min(workers, boards)
+        seeds = SeedSequence(seed).spawn(shards)
+        jobs = [(boards // shards + (i < boards % shards), x) for i, x in enumerate(seeds)]
+    result = RangeEquity(
+        [x for x, _ in hero_codes],
+        [w for _, w in hero_codes],
+        [0.0] * len(hero_codes),
+        [0.0] * len(hero_codes),
+        exact=exact,
+    )
+    args = (hero_codes, villain_codes, board_codes, remaining)
+    if workers == 1:
+        for job in jobs:
+            result.merge(range_shard(*args, job))
+        return result
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for shard in executor.map(range_shard, *(itertools.repeat(x) for x in args), jobs):
+            result.merge(shard)
+    return result
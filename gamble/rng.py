@@ -0,0 +1,172 @@
+"""
+random number generator streams
+"""
+
+import hashlib
+import random
+from typing import Any
+
+
+class GlobalRandom(random.Random):
+    """
+    a random.Random that draws from the public module level functions in random
+
+    it keeps no state of its own, so random.seed still makes every default
+    generator in gamble reproducible
+    """
+
+    def __init__(self) -> None:
+        # the state lives in the random module, so there is nothing to seed here
+        self.gauss_next = None
+
+    def seed(self, *args: Any, **kwargs: Any) -> None:
+        """
+        seed the module level generator
+
+        Args:
+            *args: passed to random.seed
+            **kwargs: passed to random.seed
+        """
+        random.seed(*args, **kwargs)
+
+    def random(self) -> float:
+        """
+        a float in [0, 1) from the module level generator
+
+        Returns:
+            the next random float
+        """
+        return random.random()
+
+    def getrandbits(self, k: int) -> int:
+        """
+        random bits from the module level generator
+
+        Args:
+            k: the number of bits
+
+        Returns:
+            an int with k random bits
+        """
+        return random.getrandbits(k)
+
+    def getstate(self) -> tuple[Any, ...]:
+        """
+        the state of the module level generator
+
+        Returns:
+            the state, see random.getstate
+        """
+        return random.getstate()
+
+    def setstate(self, state: tuple[Any, ...]) -> None:
+        """
+        restore the state of the module level generator
+
+        Args:
+            state: a state from getstate
+        """
+        random.setstate(state)
+
+
+GLOBAL_RNG = GlobalRandom()
+
+
+def default_rng() -> random.Random:
+    """
+    the generator used when no rng is given, backed by the module level functions in random
+
+    Returns:
+        the shared GlobalRandom instance
+    """
+    return GLOBAL_RNG
+
+
+class SeedSequence:
+    """
+    a seed that can be split into statistically independent child seeds
+
+    children are derived by hashing the root entropy together with the path of
+    spawn indices, so the same root seed always produces the same tree of streams
+
+    Args:
+        entropy: the root seed, a random one is drawn from the os if not given
+        spawn_key: the path of child indices from the root seed to this one
+    """
+
+    def __init__(self, entropy: int | None = None, spawn_key: tuple[int, ...] = ()) -> None:
+        self.entropy = random.SystemRandom().getrandbits(128) if entropy is None else entropy
+        self.spawn_key = spawn_key
+        self.children_spawned = 0
+
+    def __str__(self) -> str:
+        """
+        dunder str method
+
+        Returns:
+            the string representation of this seed sequence
+        """
+        return f"<SeedSequence({self.entropy}, {self.spawn_key})>"
+
+    def __repr__(self) -> str:
+        """
+        dunder repr method
+
+        Returns:
+            the repr representation of this seed sequence
+        """
+        return self.__str__()
+
+    @property
+    def state(self) -> int:
+        """
+        the seed material for this node of the tree
+
+        Returns:
+            a 256 bit integer derived from the entropy and spawn key
+        """
+        key = ":".join(str(x) for x in (self.entropy, *self.spawn_key))
+        return int.from_bytes(hashlib.sha256(key.encode()).digest(), "big")
+
+    def spawn(self, num_children: int) -> list["SeedSequence"]:
+        """
+        create independent child seed sequences
+
+        calling spawn again continues where the last call left off, so children
+        are never handed out twice
+
+        Args:
+            num_children: the number of children to create
+
+        Returns:
+            a list of child seed sequences
+        """
+        start = self.children_spawned
+        self.children_spawned += num_children
+        return [
+            SeedSequence(self.entropy, (*self.spawn_key, i))
+            for i in range(start, self.children_spawned)
+        ]
+
+    def rng(self) -> random.Random:
+        """
+        create a generator seeded from this seed sequence
+
+        Returns:
+            a new random.Random instance
+        """
+        return random.Random(self.state)  # nosec
+
+
+def spawn(seed: int | None, num_streams: int) -> list[random.Random]:
+    """
+    create independent generators for a number of workers from one root seed
+
+    Args:
+        seed: the root seed, or None for a random one
+        num_streams: the number of generators to create
+
+    Returns:
+        a list of independent random.Random instances
+    """
+    return [x.rng() for x in SeedSequence(seed).spawn(num_streams)]
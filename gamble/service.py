@@ -0,0 +1,183 @@
+"""
+asyncio roll service that coalesces concurrent requests into batched draws
+"""
+
+import asyncio
+import random
+from collections import OrderedDict
+from gamble.models.dice import Dice, normalize
+
+
+class RollService:
+    """
+    an asyncio roller that fulfils concurrent requests for the same dice with one batch
+
+    the first request for an expression opens a batch window, every request for
+    an equivalent expression (the same normalized d-string) that arrives inside
+    the window joins the batch, and the whole batch is then rolled with a single
+    Dice.roll_batch call
+
+    Args:
+        window: the number of seconds to wait for more requests before rolling a batch
+        max_batch: the max number of requests in one batch, a full batch is rolled right away
+        alias: if the dice should be sampled from cached alias tables
+        rng: the random generator for every roll, defaults to the global random state
+        cache_size: the max number of dice kept between batches, least recently used first out
+    """
+
+    def __init__(
+        self,
+        window: float = 0.001,
+        max_batch: int = 1024,
+        alias: bool = False,
+        rng: random.Random | None = None,
+        cache_size: int = 256,
+    ) -> None:
+        self.window = window
+        self.max_batch = max_batch
+        self.alias = alias
+        self.rng = rng
+        self.cache_size = cache_size
+        self.dice: OrderedDict[str, Dice] = OrderedDict()
+        self._pending: dict[str, list[tuple[asyncio.Future, float]]] = {}
+        self._timers: dict[str, asyncio.TimerHandle] = {}
+        self.requests = 0
+        self.batches = 0
+        self.rolls = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.started: float | None = None
+        self.finished: float | None = None
+
+    def __str__(self) -> str:
+        """
+        dunder str method
+
+        Returns:
+            the string representation of this service
+        """
+        return f"<RollService requests={self.requests} batches={self.batches}>"
+
+    def __repr__(self) -> str:
+        """
+        dunder repr method
+
+        Returns:
+            the repr representation of this service
+        """
+        return self.__str__()
+
+    async def roll(self, d_string: str) -> int:
+        """
+        roll a set of dice, sharing the draw with any concurrent requests for them
+
+        an invalid expression raises right away, without joining a batch
+
+        Args:
+            d_string: a d-notation string representing a set of dice
+
+        Returns:
+            the value rolled by the dice
+        """
+        key = normalize(d_string)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        now = loop.time()
+        if self.started is None:
+            self.started = now
+        self.requests += 1
+        queue = self._pending.setdefault(key, [])
+        queue.append((future, now))
+        if len(queue) >= self.max_batch:
+            self.flush(key)
+        elif key not in self._timers:
+            self._timers[key] = loop.call_later(self.window, self.flush, key)
+        return await future
+
+    def get_dice(self, d_string: str) -> Dice:
+        """
+        the cached dice for an expression, kept in an lru cache by normalized d-string
+
+        the dice are only built the first time an equivalent expression is seen
+
+        Args:
+            d_string: a d-notation string representing a set of dice
+
+        Returns:
+            the dice shared by every equivalent expression
+        """
+        key = normalize(d_string)
+        if key in self.dice:
+            self.dice.move_to_end(key)
+            return self.dice[key]
+        dice = self.dice[key] = Dice(key, alias=self.alias, rng=self.rng)
+        if len(self.dice) > self.cache_size:
+            self.dice.popitem(last=False)
+        return dice
+
+    def flush(self, key: str) -> None:
+        """
+        roll the pending batch for an expression and resolve every waiting request
+
+        Args:
+            key: the normalized d-string of the batch
+        """
+        timer = self._timers.pop(key, None)
+        if timer:
+            timer.cancel()
+        waiting = [(x, t) for x, t in self._pending.pop(key, []) if not x.done()]
+        if not waiting:
+            return
+        try:
+            rolls = self.get_dice(key).roll_batch(len(waiting))
+        except Exception as error:
+            for future, _ in waiting:
+                future.set_exception(error)
+            return
+        now = asyncio.get_running_loop().time()
+        for (future, requested), value in zip(waiting, rolls, strict=True):
+            future.set_result(value)
+            self.total_latency += now - requested
+            self.max_latency = max(self.max_latency, now - requested)
+        self.batches += 1
+        self.rolls += len(waiting)
+        self.finished = now
+
+    def flush_all(self) -> None:
+        """
+        roll every pending batch right away
+        """
+        for key in list(self._pending):
+            self.flush(key)
+
+    @property
+    def mean_batch_size(self) -> float:
+        """
+        the average number of requests fulfilled per batch
+
+        Returns:
+            rolls per batch
+        """
+        return self.rolls / self.batches if self.batches else 0.0
+
+    @property
+    def mean_latency(self) -> float:
+        """
+        the average number of seconds a request waited for its roll
+
+        Returns:
+            the mean latency in seconds
+        """
+        return self.total_latency / self.rolls if self.rolls else 0.0
+
+    @property
+    def throughput(self) -> float:
+        """
+        the number of rolls fulfilled per second, from the first request to the last batch
+
+        Returns:
+            rolls per second
+        """
+        if self.started is None or self.finished is None or self.finished <= self.started:
+            return 0.0
+        return self.rolls / (self.finished - self.started)
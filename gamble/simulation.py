@@ -0,0 +1,229 @@
+"""
+monte carlo simulations for dice experiments
+"""
+
+import math
+import os
+from collections import Counter
+from collections.abc import Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from gamble.errors import GambleException
+from gamble.models.dice import Dice
+from gamble.rng import SeedSequence
+
+MODES: dict[str, Callable[[Iterable[int]], int]] = {"sum": sum, "max": max, "min": min}
+
+
+@dataclass
+class SimulationResult:
+    """
+    the merged result of a dice simulation
+
+    Args:
+        histogram: a count of how many trials produced each total
+    """
+
+    histogram: Counter = field(default_factory=Counter)
+
+    def __str__(self) -> str:
+        """
+        dunder str method
+
+        Returns:
+            the string representation of this result
+        """
+        return f"<SimulationResult[{self.trials}] mean={self.mean:.4f}>"
+
+    def merge(self, other: "SimulationResult") -> "SimulationResult":
+        """
+        merge another result into this one
+
+        Args:
+            other: the result to merge in
+
+        Returns:
+            this result, for chaining
+        """
+        self.histogram.update(other.histogram)
+        return self
+
+    @property
+    def trials(self) -> int:
+        """
+        the number of trials in this result
+
+        Returns:
+            the total count of the histogram
+        """
+        return sum(self.histogram.values())
+
+    @property
+    def min(self) -> int:
+        """
+        the smallest total seen
+
+        Returns:
+            the min total
+        """
+        return min(self.histogram)
+
+    @property
+    def max(self) -> int:
+        """
+        the largest total seen
+
+        Returns:
+            the max total
+        """
+        return max(self.histogram)
+
+    @property
+    def mean(self) -> float:
+        """
+        the mean of every trial
+
+        Returns:
+            the mean total
+        """
+        return sum(total * count for total, count in self.histogram.items()) / self.trials
+
+    @property
+    def variance(self) -> float:
+        """
+        the population variance of every trial, computed exactly from the histogram
+
+        Returns:
+            the variance
+        """
+        first = sum(total * count for total, count in self.histogram.items())
+        second = sum(total * total * count for total, count in self.histogram.items())
+        return (self.trials * second - first * first) / (self.trials * self.trials)
+
+    @property
+    def stddev(self) -> float:
+        """
+        the standard deviation of every trial
+
+        Returns:
+            the standard deviation
+        """
+        return math.sqrt(self.variance)
+
+    def pmf(self, value: int) -> float:
+        """
+        the observed chance of a total
+
+        Args:
+            value: the total to check
+
+        Returns:
+            the fraction of trials that produced exactly value
+        """
+        return self.histogram[value] / self.trials
+
+    def at_least(self, value: int) -> float:
+        """
+        the observed chance of reaching a total
+
+        Args:
+            value: the total to check
+
+        Returns:
+            the fraction of trials that produced value or higher
+        """
+        return sum(count for total, count in self.histogram.items() if total >= value) / self.trials
+
+
+def run_shard(  # noqa: PLR0913, PLR0917
+    d_string: str,
+    trials: int,
+    num_rolls: int,
+    mode: str,
+    seed: SeedSequence,
+    rigged_factor: int = -1,
+    alias: bool = False,
+    chunk_size: int = 100_000,
+) -> SimulationResult:
+    """
+    run one shard of a simulation, in chunks, with its own generator
+
+    Args:
+        d_string: a d-notation string representing a set of dice
+        trials: the number of trials in this shard
+        num_rolls: the number of rolls per trial
+        mode: how the rolls in a trial are combined, one of MODES
+        seed: the seed sequence for this shard's generator
+        rigged_factor: int from 0-100 to manipulate the die into a high roll
+        alias: if the dice should be sampled from an alias table
+        chunk_size: the max number of trials to roll at once
+
+    Returns:
+        the result for this shard
+    """
+    dice = Dice(d_string, rigged_factor, alias=alias, rng=seed.rng())
+    reduce = MODES[mode]
+    result = SimulationResult()
+    for rolls in dice.roll_chunks(trials * num_rolls, chunk_size * num_rolls):
+        if num_rolls == 1:
+            result.histogram.update(rolls)
+        else:
+            result.histogram.update(map(reduce, zip(*[iter(rolls)] * num_rolls, strict=True)))
+    return result
+
+
+def simulate(  # noqa: PLR0913, PLR0917
+    d_string: str,
+    trials: int,
+    num_rolls: int = 1,
+    mode: str = "max",
+    rigged_factor: int = -1,
+    alias: bool = False,
+    seed: int | None = None,
+    workers: int | None = None,
+    shards: int | None = None,
+) -> SimulationResult:
+    """
+    simulate a dice experiment, sharding the trials across a process pool
+
+    each trial rolls the dice num_rolls times and combines them like
+    Dice.max_of / Dice.min_of (or sums them). every shard gets an independent
+    generator spawned from the root seed, so a run with the same seed and
+    number of shards is reproducible no matter how many workers run it
+
+    Args:
+        d_string: a d-notation string representing a set of dice
+        trials: the total number of trials to run
+        num_rolls: the number of rolls per trial, 2 with mode max for advantage
+        mode: how the rolls in a trial are combined, one of MODES
+        rigged_factor: int from 0-100 to manipulate the die into a high roll
+        alias: if the dice should be sampled from an alias table
+        seed: the root seed, or None for a random one
+        workers: the number of processes to use, defaults to the cpu count
+        shards: the number of independent shards, defaults to the number of workers
+
+    Returns:
+        the merged result of every trial
+    """
+    if mode not in MODES:
+        raise GambleException(f"mode must be one of {tuple(MODES)}")
+    if trials < 1 or num_rolls < 1:
+        raise GambleException("a simulation needs at least one trial and one roll")
+    workers = workers or os.cpu_count() or 1
+    shards = min(shards or workers, trials)
+    seeds = SeedSequence(seed).spawn(shards)
+    sizes = [trials // shards + (i < trials % shards) for i in range(shards)]
+    jobs = [
+        (d_string, size, num_rolls, mode, shard_seed, rigged_factor, alias)
+        for size, shard_seed in zip(sizes, seeds, strict=True)
+    ]
+    result = SimulationResult()
+    if workers == 1:
+        for job in jobs:
+            result.merge(run_shard(*job))
+        return result
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_shard, *job) for job in jobs]
+        for future in futures:
+            result.merge(future.result())
+    return result
@@ -0,0 +1,176 @@
+"""
+online statistics for streams of rolls
+"""
+
+import math
+from array import array
+from gamble.errors import GambleException
+from gamble.models.distribution import Distribution
+
+
+class RollStats:
+    """
+    an online accumulator for rolls, using welford's algorithm and a fixed histogram
+
+    no rolls are stored, and accumulators from different workers can be merged
+
+    Args:
+        low: the smallest value that can be rolled
+        high: the largest value that can be rolled
+    """
+
+    def __init__(self, low: int, high: int) -> None:
+        if high < low:
+            raise GambleException("the high value must not be less than the low value")
+        self.low = low
+        self.high = high
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.histogram = array("Q", bytes(8 * (high - low + 1)))
+
+    def __str__(self) -> str:
+        """
+        dunder str method
+
+        Returns:
+            the string representation of these stats
+        """
+        return f"<RollStats[{self.count}] mean={self.mean:.4f} stddev={self.stddev:.4f}>"
+
+    def __repr__(self) -> str:
+        """
+        dunder repr method
+
+        Returns:
+            the repr representation of these stats
+        """
+        return self.__str__()
+
+    def _check(self, low: int, high: int) -> None:
+        """
+        make sure values fit inside the histogram
+
+        Args:
+            low: the smallest value to record
+            high: the largest value to record
+        """
+        if low < self.low or high > self.high:
+            raise GambleException(f"rolls must be between {self.low} and {self.high}")
+
+    def update(self, value: int) -> None:
+        """
+        record a single roll
+
+        Args:
+            value: the value rolled
+        """
+        self._check(value, value)
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.histogram[value - self.low] += 1
+
+    def update_many(self, values: list[int]) -> None:
+        """
+        record a batch of rolls
+
+        Args:
+            values: the values rolled
+        """
+        if not values:
+            return
+        self._check(min(values), max(values))
+        batch = RollStats(self.low, self.high)
+        batch.count = len(values)
+        batch.mean = sum(values) / batch.count
+        batch.m2 = math.fsum((x - batch.mean) ** 2 for x in values)
+        for value in values:
+            batch.histogram[value - self.low] += 1
+        self.merge(batch)
+
+    def merge(self, other: "RollStats") -> "RollStats":
+        """
+        merge another accumulator into this one (chan's parallel algorithm)
+
+        Args:
+            other: the accumulator to merge in, with the same bounds
+
+        Returns:
+            this accumulator, for chaining
+        """
+        if (other.low, other.high) != (self.low, self.high):
+            raise GambleException("only stats with the same bounds can be merged")
+        count = self.count + other.count
+        if not count:
+            return self
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        for i, frequency in enumerate(other.histogram):
+            self.histogram[i] += frequency
+        return self
+
+    @property
+    def variance(self) -> float:
+        """
+        the population variance of every roll
+
+        Returns:
+            the variance
+        """
+        return self.m2 / self.count if self.count else 0.0
+
+    @property
+    def sample_variance(self) -> float:
+        """
+        the sample (bessel corrected) variance of every roll
+
+        Returns:
+            the sample variance
+        """
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stddev(self) -> float:
+        """
+        the population standard deviation of every roll
+
+        Returns:
+            the standard deviation
+        """
+        return math.sqrt(self.variance)
+
+    def frequency(self, value: int) -> int:
+        """
+        the number of times a value was rolled
+
+        Args:
+            value: the value to check
+
+        Returns:
+            the count of rolls with this value
+        """
+        if not self.low <= value <= self.high:
+            return 0
+        return self.histogram[value - self.low]
+
+    def chi_square(self, expected: Distribution) -> float:
+        """
+        pearson's chi-square statistic of these rolls against an expected distribution
+
+        a useful fairness metric, larger values mean the rolls fit the distribution worse
+
+        Args:
+            expected: the distribution the rolls should follow
+
+        Returns:
+            the chi-square statistic
+        """
+        statistic = 0.0
+        for value, probability in expected.probabilities.items():
+            count = self.count * probability
+            statistic += (self.frequency(value) - count) ** 2 / count
+        return statistic
@@ -0,0 +1,179 @@
+"""
+tests for the blackjack submodule of gamble
+"""
+
+import pytest
+from gamble.errors import GambleException
+from gamble.models.blackjack import (
+    BUST,
+    BetSpread,
+    HiLo,
+    Rules,
+    Strategy,
+    action_ev,
+    composition_of,
+    dealer_outcomes,
+    dealer_probabilities,
+    hand_value,
+    play_round,
+    remove,
+    simulate,
+)
+from gamble.models.cards import BlackJackDeck
+from gamble.models.compact import CompactShoe
+
+
+def stacked(*values: int) -> CompactShoe:
+    """helper to get a shoe that deals the given card values first"""
+    shoe = CompactShoe(8, shuffle=False)
+    shoe.codes[: len(values)] = bytes(x - 1 for x in values)
+    return shoe
+
+
+def test_hand_value() -> None:
+    """tests hard and soft blackjack totals"""
+    assert hand_value([10, 6]) == (16, False)
+    assert hand_value([1, 6]) == (17, True)
+    assert hand_value([1, 6, 10]) == (17, False)
+    assert hand_value([1, 1]) == (12, True)
+    assert hand_value([1, 10]) == (21, True)
+
+
+def test_strategy() -> None:
+    """tests basic strategy and the hi-lo index plays"""
+    basic = Strategy.basic()
+    assert basic.action([10, 6], 10) == "H"
+    assert basic.action([10, 6], 10, can_surrender=True) == "R"
+    assert basic.action([10, 6], 6) == "S"
+    assert basic.action([5, 6], 1) == "D"
+    assert basic.action([5, 6], 1, can_double=False) == "H"
+    assert basic.action([1, 7], 3) == "D"
+    assert basic.action([1, 7], 3, can_double=False) == "S"
+    assert basic.action([1, 7], 9) == "H"
+    assert basic.action([1, 1], 10) == "P"
+    assert basic.action([1, 1], 10, can_split=False) == "H"
+    assert basic.action([10, 10], 6) == "S"
+    assert basic.action([2, 3], 6) == "H"
+    assert basic.action([10, 8], 1) == "S"
+
+    counter = Strategy.hi_lo()
+    assert counter.insurance_index == 3
+    assert counter.action([10, 6], 10, true_count=0) == "S"
+    assert counter.action([10, 6], 10, true_count=-1) == "H"
+    assert counter.action([10, 2], 3, true_count=2) == "S"
+    assert counter.action([10, 2], 3, true_count=1) == "H"
+    assert counter.action([10, 10], 6, true_count=4) == "P"
+    assert counter.action([10, 10], 6, true_count=3) == "S"
+
+
+def test_bet_spread() -> None:
+    """tests betting with the count"""
+    spread = BetSpread({1: 2, 2: 4, 3: 8})
+    assert spread.bet(-2) == 1
+    assert spread.bet(1.5) == 2
+    assert spread.bet(7) == 8
+    count = HiLo()
+    for code in (1, 2, 3, 0, 9):
+        count.see(code)
+    assert count.running == 1
+    assert count.true_count(104) == 0.5
+    count.reset()
+    assert count.running == 0
+
+
+def test_play_round() -> None:
+    """tests single rounds dealt from stacked shoes"""
+    rules = Rules()
+    basic = Strategy.basic()
+    flat = BetSpread()
+    assert play_round(stacked(1, 10, 9, 7), rules, basic, flat, HiLo()) == (1, 1.5)
+    assert play_round(stacked(10, 7, 1, 10), rules, basic, flat, HiLo()) == (1, -1)
+    assert play_round(stacked(1, 10, 1, 10), rules, basic, flat, HiLo()) == (1, 0)
+    assert play_round(stacked(5, 6, 6, 10, 10, 10), rules, basic, flat, HiLo()) == (2, 2)
+    assert play_round(stacked(8, 8, 6, 10, 3, 10, 2, 10), rules, basic, flat, HiLo()) == (4, 4)
+    assert play_round(stacked(10, 6, 10, 7, 10), rules, basic, flat, HiLo()) == (1, -1)
+    surrender = Rules(surrender=True)
+    assert play_round(stacked(10, 6, 10, 7), surrender, basic, flat, HiLo()) == (1, -0.5)
+
+
+def test_simulate() -> None:
+    """tests simulating many rounds across processes"""
+    result = simulate(20_000, seed=1, workers=1, shards=2)
+    assert result.rounds == 20_000
+    assert -0.03 < result.edge < 0.02
+    assert 1.0 < result.stddev < 1.3
+    assert result.risk_of_ruin(100) == 1.0
+    assert simulate(20_000, seed=1, workers=2, shards=2) == result
+
+    counter = simulate(
+        20_000,
+        strategy=Strategy.hi_lo(),
+        spread=BetSpread({1: 2, 2: 4, 3: 8}),
+        seed=1,
+        workers=1,
+    )
+    assert counter.wagered > counter.rounds
+    assert str(counter).startswith("<BlackjackResult[20000]")
+    with pytest.raises(GambleException):
+        simulate(0)
+
+
+def test_composition() -> None:
+    """test shoe compositions by blackjack value"""
+    deck = BlackJackDeck(num_decks=1)
+    assert composition_of(deck) == (4, 4, 4, 4, 4, 4, 4, 4, 4, 16)
+    deck.draw(3)
+    assert sum(composition_of(deck)) == 49
+    assert composition_of(CompactShoe(num_decks=2)) == (8,) * 9 + (32,)
+    assert composition_of([0, 9, 10, 51]) == (1, 0, 0, 0, 0, 0, 0, 0, 0, 3)
+    assert remove((1, 2, 3), 2) == (1, 1, 3)
+
+
+def test_dealer_probabilities() -> None:
+    """test the exact dealer outcomes"""
+    shoe = composition_of(BlackJackDeck(num_decks=6))
+    for up in range(1, 11):
+        chances = dealer_probabilities(remove(shoe, up), up)
+        assert sum(chances.values()) == pytest.approx(1)
+    assert dealer_probabilities(remove(shoe, 6), 6)[BUST] == pytest.approx(0.44, abs=0.01)
+    assert dealer_probabilities(remove(shoe, 10), 10)[BUST] < 0.25
+    s17 = Rules(hit_soft_17=False)
+    assert (
+        dealer_probabilities(remove(shoe, 6), 6, s17)[17]
+        > dealer_probabilities(remove(shoe, 6), 6)[17]
+    )
+    # with only tens left, a dealer 2 always busts and a dealer 7 always makes 17
+    assert dealer_probabilities((0,) * 9 + (10,), 2)[BUST] == 1
+    assert dealer_probabilities((0,) * 9 + (10,), 7)[17] == 1
+    assert dealer_outcomes.cache_info().maxsize is not None
+
+
+def test_action_ev() -> None:
+    """test the exact ev of each action"""
+    shoe = composition_of(BlackJackDeck(num_decks=6))
+
+    def evs(player: list[int], up: int, rules: Rules | None = None) -> dict[str, float]:
+        """helper to get the action evs, with the dealt cards taken out of the shoe"""
+        unseen = shoe
+        for value in [*player, up]:
+            unseen = remove(unseen, value)
+        return action_ev(unseen, player, up, rules)
+
+    hard_16 = evs([10, 6], 10)
+    assert hard_16["stand"] == pytest.approx(-0.54, abs=0.01)
+    assert hard_16["hit"] > hard_16["stand"]
+    assert "split" not in hard_16
+    eleven = evs([5, 6], 6)
+    assert eleven["double"] == pytest.approx(0.68, abs=0.01)
+    assert max(eleven, key=eleven.__getitem__) == "double"
+    eights = evs([8, 8], 6)
+    assert max(eights, key=eights.__getitem__) == "split"
+    assert evs([10, 10], 6)["stand"] > evs([10, 10], 6)["split"]
+    soft_18 = evs([1, 7], 9)
+    assert soft_18["hit"] > soft_18["stand"]
+    assert evs([1, 10], 10) == {"stand": 1.5}
+    assert evs([10, 6], 10, Rules(surrender=True))["surrender"] == -0.5
+    assert "double" not in evs([2, 3, 4], 5)
+    # a rich shoe of tens makes standing on 12 against a 4 better than hitting
+    rich = (4, 4, 4, 4, 4, 4, 4, 4, 4, 60)
+    assert action_ev(rich, [10, 2], 4)["stand"] > action_ev(rich, [10, 2], 4)["hit"]
@@ -2,10 +2,12 @@
 tests for the cards submodule of gamble
 """
 
+import pickle
+from collections import Counter
 import pytest
 import random
-from gamble import Card, Deck, EuchreDeck, Hand
-from gamble.errors import InvalidCard
+from gamble import CARDS, BlackJackDeck, Card, Deck, EuchreDeck, Hand, MultiDeck
+from gamble.errors import GambleException, InvalidCard
 
 
 random.seed(420)
@@ -127,3 +129,159 @@ def test_hand_ranks() -> None:
 
     assert two_pair > one_pair
     assert low_straight_flush < high_straight_flush
+
+
+def test_hand_ordering() -> None:
+    """tests that hands are ordered with kickers"""
+    low_flush = Hand.get("2c,3c,4c,5c,Kc")
+    high_flush = Hand.get("2h,3h,4h,5h,Ah")
+    assert low_flush < high_flush
+    assert low_flush <= high_flush
+    assert high_flush >= low_flush
+    assert Hand.get("Ac,Ad,9s,5c,2h") < Hand.get("Ah,As,Ks,5d,2c")
+    assert Hand.get("Kc,Kd,Qs,Qc,2h") > Hand.get("Kh,Ks,Js,Jd,Ac")
+    assert Hand.get("2c,3h,4c,5c,Ah") < Hand.get("2c,3h,4c,5c,6h")
+    assert Hand.get("Ac,Ad,9s,5c,2h") == Hand.get("Ah,As,9c,5d,2c")
+    assert Hand.get("Ac,Ad,9s,5c,2h") != Hand.get("Ac,Ad,9s,5c,3h")
+    assert len({Hand.get("Ac,Ad,9s,5c,2h"), Hand.get("Ah,As,9c,5d,2c")}) == 1
+    assert Hand.get("Kc,Kd,3s") > Hand.get("Qc,Qd,As")
+    assert Hand.get("Kc,Kd,3s") > Hand.get("Kh,Ks,2s")
+    hands = [Hand.get(x) for x in ("2c,3c,4c,5c,Kc", "2c,4h,4c,Kc,Kh", "2c,3c,4c,Kc,Kh")]
+    assert [x.rank for x in sorted(hands)] == [
+        Hand.Ranks.PAIR,
+        Hand.Ranks.TWO_PAIR,
+        Hand.Ranks.FLUSH,
+    ]
+    assert hands[0].value_counts[13] == 1
+    assert hands[0].suit_counts[hands[0].cards[0].suit.value] == 5
+    assert not hasattr(hands[0], "__dict__")
+
+
+def test_interned_cards() -> None:
+    """tests the shared, immutable, hashable cards"""
+    ace = Card.get("as")
+    assert ace is Card.get("AS")
+    assert ace is Card.from_code(0)
+    assert ace == Card()
+    assert ace.code == 0
+    assert Card.get("KH").code == 51
+    assert len(CARDS) == 52
+    assert [x.code for x in CARDS] == list(range(52))
+    assert len({Card.get("2c"), Card.get("2C"), Card(Card.Values.TWO, Card.Suits.CLUBS)}) == 1
+    assert {ace: 1}[Card()] == 1
+
+    with pytest.raises(AttributeError):
+        ace.value = Card.Values.KING
+
+    assert pickle.loads(pickle.dumps(ace)) == ace  # noqa: S301
+
+    deck = Deck(shuffle=False)
+    assert all(x is CARDS[x.code] for x in deck.cards)
+
+
+def test_deck_composition() -> None:
+    """tests the per card counts kept by a deck"""
+    shoe = BlackJackDeck(num_decks=8)
+    ace = Card.get("as")
+    assert ace in shoe
+    assert shoe.count(ace) == 8
+    assert shoe.composition[1] == 32
+    assert shoe.tens_remaining == 128
+    assert shoe.high_low_ratio == 1.0
+    drawn = shoe.draw(times=100)
+    assert isinstance(drawn, list)
+    assert sum(shoe.counts) == shoe.cards_left == 316
+    assert shoe.count(ace) == 8 - drawn.count(ace)
+    assert shoe.composition == dict(Counter(x.value.value for x in shoe.cards))
+    shoe.clear()
+    assert ace not in shoe
+    assert shoe.high_low_ratio == float("inf")
+
+    deck = Deck(cards=[Card.get("ks"), Card.get("2s")], shuffle=False)
+    assert deck.tens_remaining == 1
+    assert deck.draw() == Card.get("2s")
+    assert Card.get("2s") not in deck
+
+    deck = Deck(shuffle=False)
+    deck.cards = [Card.get("as")]
+    assert Card.get("kh") not in deck
+    assert sum(deck.counts) == deck.cards_left == 1
+
+
+def test_deal() -> None:
+    """tests dealing many hands at once"""
+    deck = Deck(shuffle=False)
+    order = list(reversed(deck.cards))
+    hands = deck.deal(9, 2)
+    assert [len(x) for x in hands] == [2] * 9
+    assert hands[0].cards == sorted([order[0], order[9]])
+    assert deck.draws == 18
+    assert deck.cards_left == 34
+    assert order[0] not in deck
+    blocks = deck.deal(2, 3, order="block")
+    assert blocks[0].cards == sorted(order[18:21])
+    assert deck.draws == 24
+    assert deck.draw(times=3) == order[24:27]
+    assert deck.draw(times=0) == []
+    with pytest.raises(IndexError):
+        deck.draw(times=26)
+    assert deck.draws == 27
+    assert sum(deck.counts) == deck.cards_left == 25
+    deck.draw(times=25)
+    with pytest.raises(IndexError):
+        deck.draw()
+    assert deck.draws == 52
+    with pytest.raises(GambleException):
+        deck.deal(2, 2, order="random")
+
+    tables = BlackJackDeck.deal_many(100, 7, 2, rng=random.Random(1), num_decks=2)
+    assert len(tables) == 100
+    assert all(len(x) == 7 for x in tables)
+    assert all(len({card.code for hand in x for card in hand.cards}) <= 14 for x in tables)
+    assert len({tuple(x[0].cards) for x in tables}) > 50
+
+    shuffled: list[str] = []
+
+    class TrackedDeck(EuchreDeck):
+        """helper deck that records which decks get shuffled"""
+
+        def shuffle(self, times: int = 1) -> None:
+            """helper that records the shuffle"""
+            shuffled.append(type(self).__name__)
+            super().shuffle(times)
+
+    euchre = TrackedDeck.deal_many(5, 4, 5, rng=random.Random(2))
+    assert shuffled == ["TrackedDeck"] * 5
+    assert all(x.value.value >= 9 or x.value.value == 1 for y in euchre for h in y for x in h.cards)
+    assert MultiDeck(num_decks=2, shuffle=False).shuffles == 0
+
+
+def test_lazy_shuffle() -> None:
+    """tests that a lazy deck only randomizes the positions it reaches"""
+    deck = Deck(rng=random.Random(7), lazy=True)
+    assert deck.shuffles == 1
+    assert deck._unsettled == 52
+    hand = deck.draw_hand()
+    assert deck._unsettled == 47
+    assert len(set(hand.cards)) == 5
+    assert deck.top not in hand.cards
+    assert deck._unsettled == 46
+    assert {x.code for x in deck.cards + hand.cards} == set(range(52))
+    assert deck._unsettled == 0
+    deck.shuffle(times=3)
+    assert deck.shuffles == 4
+    assert deck._unsettled == 47
+
+    rng = random.Random(8)
+    tops: Counter[int] = Counter()
+    seconds: Counter[int] = Counter()
+    for _ in range(5200):
+        deck = Deck(rng=rng, lazy=True)
+        tops[deck.top.code] += 1
+        deck.draw()
+        seconds[deck.top.code] += 1
+    assert len(tops) == len(seconds) == 52
+    assert max(tops.values()) < 160
+    assert min(tops.values()) > 50
+    assert max(seconds.values()) < 160
+    assert min(seconds.values()) > 50
@@ -0,0 +1,116 @@
+"""
+tests for the compact submodule of gamble
+"""
+
+import random
+from collections import Counter
+import pytest
+from gamble import CARDS, Card, EuchreDeck
+from gamble.errors import GambleException
+from gamble.models.compact import CompactShoe, DeckBatch
+
+
+def test_deck_batch() -> None:
+    """tests shuffling many decks at once"""
+    batch = DeckBatch(1000, rng=random.Random(1))
+    assert len(batch) == 1000
+    assert str(batch) == "<DeckBatch[1000x52]>"
+    assert len(batch.codes) == 52000
+    assert all(sorted(batch.row(i)) == list(range(52)) for i in range(1000))
+    assert len({batch.row(i) for i in range(1000)}) == 1000
+    tops = Counter(batch.row(i)[0] for i in range(1000))
+    assert len(tops) == 52
+    assert max(tops.values()) < 45
+
+    first = batch.row(0)
+    batch.shuffle()
+    assert batch.shuffles == 2
+    assert batch.row(0) != first
+    assert DeckBatch(3, shuffle=False).row(2) == bytes(range(52))
+    assert sorted(DeckBatch(2, EuchreDeck()).row(1)) == sorted(x.code for x in EuchreDeck().cards)
+
+
+def test_deck_view() -> None:
+    """tests drawing from one deck of a batch"""
+    batch = DeckBatch(2, shuffle=False)
+    deck = batch[1]
+    assert deck.cards_left == len(deck) == 52
+    assert deck.top is CARDS[0]
+    assert deck.draw() is CARDS[0]
+    assert deck.draw(times=3) == list(CARDS[1:4])
+    assert deck.draw_codes(2) == bytes([4, 5])
+    assert deck.draws == 6
+    assert deck.cards_left == 46
+    assert deck.top == Card.get("7s")
+    assert batch[0].cards_left == 52
+    assert batch[-1].cards_left == 46
+    assert batch[1].draw() is CARDS[6]
+    assert deck.draws == batch.draws[1] == 7
+    draws = deck.draws
+    for times in (-1, -52):
+        with pytest.raises(GambleException):
+            deck.draw(times=times)
+    assert deck.draws == draws
+    assert deck.cards_left == 45
+    assert [x.index for x in batch] == [0, 1]
+    with pytest.raises(IndexError):
+        deck.draw(times=46)
+    deck.draw(times=45)
+    with pytest.raises(IndexError):
+        _ = deck.top
+    with pytest.raises(IndexError):
+        batch[2]
+    batch.shuffle()
+    assert deck.cards_left == 52
+
+
+def test_compact_shoe() -> None:
+    """tests a shoe stored as card codes and counts"""
+    shoe = CompactShoe(8, penetration=0.75, rng=random.Random(2))
+    ace = Card.get("as")
+    assert shoe.cards_left == len(shoe) == 416
+    assert shoe.cut_card == 312
+    assert ace in shoe
+    assert shoe.count(ace) == 8
+    assert shoe.tens_remaining == 128
+    assert str(shoe) == "<CompactShoe[416]>"
+
+    top = shoe.top
+    drawn = shoe.draw(times=100)
+    assert isinstance(drawn, list)
+    assert drawn[0] is top
+    assert all(x is CARDS[x.code] for x in drawn)
+    assert shoe.count(ace) == 8 - drawn.count(ace)
+    assert sum(shoe.counts) == shoe.cards_left == 316
+    assert shoe.draws == 100
+    assert not shoe.needs_shuffle
+    shoe.draw_codes(211)
+    code = shoe.draw_code()
+    assert shoe.draws == 312
+    assert shoe.count(CARDS[code]) == 8 - Counter(shoe.codes[: shoe.position])[code]
+    assert shoe.needs_shuffle
+    assert shoe.composition == dict(Counter(x % 13 + 1 for x in shoe.codes[shoe.position :]))
+
+    shoe.shuffle()
+    assert shoe.shuffles == 2
+    assert shoe.cards_left == 416
+    assert not shoe.needs_shuffle
+    assert sorted(Counter(shoe.codes).values()) == [8] * 52
+    shoe.draw(times=10)
+    counts = list(shoe.counts)
+    for times in (-1, -52):
+        with pytest.raises(GambleException):
+            shoe.draw(times=times)
+    assert shoe.position == 10
+    assert shoe.cards_left == 406
+    assert shoe.counts == counts
+    assert shoe.draw(times=0) == []
+    with pytest.raises(IndexError):
+        shoe.draw(times=417)
+    shoe.draw_codes(406)
+    with pytest.raises(IndexError):
+        shoe.draw_code()
+    assert shoe.draws == 728
+    with pytest.raises(GambleException):
+        CompactShoe(penetration=0)
+    assert CompactShoe(1, shuffle=False).draw() is CARDS[0]
@@ -3,8 +3,11 @@ tests for the dice submodule of gamble
 """
 
 import pytest
-from gamble import Die, RiggedDie, Dice
+import random
+from collections import Counter
+from gamble import AliasTable, Die, RiggedDie, Dice
 from gamble.errors import GambleException
+from gamble.models.dice import EXPLODE_DEPTH, DiceGroup
 
 
 def test_die_init() -> None:
@@ -130,3 +133,196 @@ def test_roll_rigged_die() -> None:
 
     the_roll, rolls = dice.max_of(100)
     assert max(rolls) == 20
+
+
+def test_dice_roll_batch() -> None:
+    """tests rolling dice in a single batch"""
+    dice = Dice("8d6+3")
+    rolls = dice.roll_many(500, batch=True)
+    assert dice.rolls == 500
+    assert len(rolls) == 500
+    assert all(dice.min <= x <= dice.max for x in rolls)
+    assert dice.dice[0].rolls == 8 * 500
+
+    negative = Dice("d20-1d4+2")
+    rolls = negative.roll_batch(500)
+    assert all(-1 <= x <= 21 for x in rolls)
+
+    the_roll, rolls = Dice("d20").max_of(10, batch=True)
+    assert the_roll == max(rolls)
+    the_roll, rolls = Dice("d20").min_of(10, batch=True)
+    assert the_roll == min(rolls)
+
+
+def test_rigged_die_roll_batch() -> None:
+    """tests batch rolling a rigged die"""
+    die = RiggedDie(20, 100)
+    assert set(die.roll_many(100)) <= {18, 19, 20}
+    assert die.rolls == 100
+
+    dice = Dice("2d20", 100)
+    _, rolls = dice.min_of(100, batch=True)
+    assert min(rolls) >= 36
+
+
+def test_dice_distribution() -> None:
+    """tests the exact distribution of a set of dice"""
+    dist = Dice("2d6").distribution()
+    assert dist.min == 2
+    assert dist.max == 12
+    assert dist.pmf(7) == pytest.approx(6 / 36)
+    assert dist.pmf(13) == 0.0
+    assert dist.cdf(4) == pytest.approx(6 / 36)
+    assert dist.cdf(1) == 0.0
+    assert dist.cdf(12) == 1.0
+    assert dist.mean == pytest.approx(7)
+    assert dist.variance == pytest.approx(35 / 6)
+    assert dist.percentile(50) == 7
+    assert dist.percentile(0) == 2
+    assert dist.percentile(100) == 12
+    assert sum(dist.probabilities.values()) == pytest.approx(1)
+
+    with pytest.raises(GambleException):
+        dist.percentile(101)
+
+
+def test_dice_distribution_complex() -> None:
+    """tests distributions with negative dice, bonuses, rigging and many dice"""
+    dice = Dice("d20-1d4+2")
+    dist = dice.distribution()
+    assert (dist.min, dist.max) == (dice.min, dice.max)
+    assert dist.mean == pytest.approx(10.5 - 2.5 + 2)
+
+    rigged = Dice("d20", 100).distribution()
+    assert rigged.min == 18
+    assert rigged.pmf(20) == pytest.approx(1 / 3)
+
+    half = Die(6).distribution().repeat(1)
+    assert half.pmf(3) == pytest.approx(1 / 6)
+
+    big = Dice("200d20").distribution()
+    assert (big.min, big.max) == (200, 4000)
+    assert big.mean == pytest.approx(2100)
+    assert big.variance == pytest.approx(200 * 399 / 12)
+    assert big.percentile(50) == 2100
+
+
+def test_dice_alias() -> None:
+    """tests sampling dice totals from a cached alias table"""
+    dice = Dice("100d6", alias=True)
+    assert dice.alias_table is Dice(" 100D6 ", alias=True).alias_table
+    assert dice.normalized == "100d6"
+    assert Dice("d20-1d4+2-1").normalized == "-1d4+1d20+1"
+
+    roll = dice.roll()
+    assert dice.rolls == 1
+    assert 100 <= roll <= 600
+    rolls = dice.roll_many(1000, batch=True)
+    assert dice.rolls == 1001
+    assert all(100 <= x <= 600 for x in rolls)
+
+    rigged = Dice("d20", 100, alias=True)
+    assert set(rigged.roll_many(200)) <= {18, 19, 20}
+
+
+def test_alias_table() -> None:
+    """tests that an alias table reproduces its distribution"""
+    dist = Dice("2d6").distribution()
+    table = AliasTable(dist)
+    mass = table.probabilities[:]
+    for index, alias in enumerate(table.aliases):
+        if alias != index:
+            mass[alias] += 1 - table.probabilities[index]
+    for index, value in enumerate(mass):
+        assert value / table.size == pytest.approx(dist.pmf(dist.min + index))
+
+    counts = Counter(table.sample_many(36000))
+    assert set(counts) <= set(range(2, 13))
+    assert counts[7] / 36000 == pytest.approx(1 / 6, abs=0.02)
+
+
+def test_dice_plan() -> None:
+    """tests the compiled roll plan for a set of dice"""
+    dice = Dice("1000d6+2d6-d4+3")
+    assert dice.plan == (DiceGroup(1, -4), DiceGroup(1002, 6))
+    assert dice.bonuses == [3]
+    assert len(dice.groups) == 2
+    assert len(dice.dice) == 1003
+    assert dice.max == 6012 - 1 + 3
+    assert dice.min == 1002 - 4 + 3
+    assert dice.d_strings == ["1000d6", "2d6", "-d4", "3"]
+    assert Dice(" 1000D6+2d6-d4+3 ").plan is dice.plan
+
+    roll = dice.roll()
+    assert dice.min <= roll <= dice.max
+    assert dice.groups[1][0].rolls == 1002
+
+    rigged = Dice("3d20", 50)
+    assert rigged.plan == (DiceGroup(3, 20, 50),)
+
+    with pytest.raises(GambleException):
+        Dice("6d")
+
+
+def test_dice_extended_notation() -> None:
+    """tests keep/drop, exploding and reroll dice notation"""
+    dice = Dice("4d6kh3+2")
+    assert dice.plan == (DiceGroup(4, 6, keep=3),)
+    assert (dice.min, dice.max) == (5, 20)
+    assert Dice("4d6dl1").normalized == "4d6kh3"
+    assert Dice("2d20dh1").normalized == "2d20kl1"
+    assert Dice("d20kh1").normalized == "1d20"
+
+    rolls = dice.roll_batch(1000)
+    assert all(5 <= x <= 20 for x in rolls)
+    assert 5 <= dice.roll() <= 20
+    assert dice.distribution().mean == pytest.approx(12.244598765432098 + 2)
+
+    advantage = Dice("2d20kh1").distribution()
+    assert advantage.pmf(20) == pytest.approx(39 / 400)
+    assert advantage.mean == pytest.approx(13.825)
+
+    exploding = Dice("d6!")
+    assert exploding.min == 1
+    assert exploding.max == 6 * (EXPLODE_DEPTH + 1)
+    assert exploding.distribution().mean == pytest.approx(4.2)
+    assert exploding.distribution().pmf(6) == 0.0
+    assert exploding.distribution().pmf(7) == pytest.approx(1 / 36)
+    assert all(x % 6 for x in exploding.roll_batch(1000))
+
+    reroll = Dice("d6r1")
+    assert reroll.distribution().pmf(1) == pytest.approx(1 / 36)
+    assert reroll.distribution().mean == pytest.approx(3.5 + 2.5 / 6)
+
+    # only the first roll is rerolled, the extra dice from an explosion are not
+    both = Dice("d6!r1", rng=random.Random(3))
+    assert both.distribution().pmf(7) == pytest.approx(7 / 36 / 6)
+    assert both.distribution().mean == pytest.approx(3.5 + 2.5 / 6 + 7 / 36 * 4.2)
+    rolls = both.roll_batch(100_000)
+    assert sum(rolls) / len(rolls) == pytest.approx(both.distribution().mean, abs=0.05)
+    assert rolls.count(7) / len(rolls) == pytest.approx(7 / 216, abs=0.003)
+
+    with pytest.raises(GambleException):
+        Dice("2d6kh3")
+
+    with pytest.raises(GambleException):
+        Dice("2d6dl2")
+
+
+def test_dice_iter_rolls() -> None:
+    """tests lazily streaming rolls"""
+    dice = Dice("8d6+3")
+    rolls = list(dice.iter_rolls(10, chunk_size=3))
+    assert len(rolls) == 10
+    assert dice.rolls == 10
+    assert all(11 <= x <= 51 for x in rolls)
+
+    endless = Dice("d20").iter_rolls(chunk_size=8)
+    assert all(1 <= next(endless) <= 20 for _ in range(100))
+
+    assert [len(x) for x in Dice("d20").roll_chunks(10, chunk_size=4)] == [4, 4, 2]
+
+    rigged = Dice("d20", 100)
+    assert rigged.stream_max(1000, chunk_size=64) == 20
+    assert 18 <= rigged.stream_min(1000, chunk_size=64) <= 20
+    assert rigged.rolls == 2000
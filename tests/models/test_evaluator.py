@@ -0,0 +1,140 @@
+"""
+tests for the evaluator submodule of gamble
+"""
+
+import itertools
+import random
+from array import array
+from collections import Counter
+import pytest
+from gamble import CARDS, Card, Hand
+from gamble.errors import InvalidHand
+from gamble.models.cards import cards_to_codes, codes_to_cards
+from gamble.models.evaluator import (
+    FLUSH,
+    PAIR,
+    ROYAL_FLUSH,
+    STRAIGHT,
+    TWO_PAIR,
+    category,
+    evaluate,
+    FULL_HOUSE,
+    STRAIGHT_FLUSH,
+    evaluate5,
+    evaluate7,
+    evaluate_all,
+    evaluate_array,
+    evaluate_many,
+    tables,
+)
+
+
+def codes(text: str) -> list[int]:
+    """helper to get card codes from a hand string"""
+    return [Card.get(x).code for x in text.split(",")]
+
+
+def test_evaluator_tables() -> None:
+    """tests that the tables hold every distinct five card hand"""
+    _, flushes, uniques, products = tables()
+    strengths = {*flushes, *uniques, *products.values()} - {0}
+    assert len(strengths) == 7462
+    assert Counter(category(x) for x in strengths)[ROYAL_FLUSH] == 1
+
+
+def test_evaluate() -> None:
+    """tests the strength ordering of five card hands"""
+    assert category(evaluate(codes("As,Ks,Qs,Js,Ts"))) == ROYAL_FLUSH
+    assert category(evaluate(codes("Ah,2c,3d,4s,5s"))) == STRAIGHT
+    assert category(evaluate(codes("2h,7h,9h,Jh,Kh"))) == FLUSH
+    assert category(evaluate(codes("Ah,Ac,3d,4s,5s"))) == PAIR
+    assert evaluate(codes("Ah,2c,3d,4s,5s")) < evaluate(codes("2h,3c,4d,5s,6s"))
+    assert evaluate(codes("Ah,Ac,3d,4s,5s")) < evaluate(codes("Ah,Ac,3d,4s,6s"))
+    assert evaluate(codes("Kh,Kc,Qd,Qs,2s")) > evaluate(codes("Kh,Kc,Jd,Js,As"))
+    assert evaluate(codes("Ah,Ac,3d,4s,5s")) == evaluate(codes("Ad,As,3c,4h,5h"))
+    assert evaluate(codes("As,As,3d,4s,5s")) == 0
+    assert evaluate(codes("As,As,Kd,Qs,Js,2c,3c")) == 0
+    assert evaluate(codes("As,As,Ks,Qs,Js")) == 0
+    assert evaluate(codes("As,Ks,Qs,Js")) == 0
+
+
+def test_evaluator_matches_hand() -> None:
+    """tests that the evaluator agrees with the hand predicates"""
+    random.seed(1)
+    hands = [random.sample(range(52), 5) for _ in range(2000)]
+    for hand, strength in zip(hands, evaluate_many(hands), strict=True):
+        cards = Hand([Card.from_code(x) for x in hand])
+        assert strength == evaluate5(*hand) == cards.strength
+        assert (cards.is_flush and cards.is_straight) == (category(strength) >= 8)
+        assert cards.is_four_of_a_kind == (category(strength) == 7)
+        assert cards.is_one_pair == (category(strength) in (PAIR, TWO_PAIR))
+
+    duplicates = Hand.get("as,as,3d,4s,5s")
+    assert duplicates.strength == 0
+    assert duplicates.rank == Hand.Ranks.PAIR
+
+
+def test_evaluate7() -> None:
+    """tests the best five of six and seven card hands"""
+    assert category(evaluate(codes("As,Ks,Qs,Js,Ts,2c,2d"))) == ROYAL_FLUSH
+    assert category(evaluate(codes("9s,Ks,Qs,Js,Ts,Ad,Ac"))) == STRAIGHT_FLUSH
+    assert category(evaluate(codes("Ah,Ac,Ad,Ks,Kc,Qs,Qc"))) == FULL_HOUSE
+    assert category(evaluate(codes("Ah,Ac,Ad,Ks,Kc,Kd,Qc"))) == FULL_HOUSE
+    assert evaluate(codes("Ah,2c,3d,4s,5s,6d")) == evaluate(codes("2c,3d,4s,5s,6d"))
+    assert evaluate(codes("Ah,Ac,Kd,Ks,Qs,Qd,Jc")) == evaluate(codes("Ah,Ac,Kd,Ks,Qc"))
+    assert evaluate(codes("As,As,As,As,As,2c,3c")) == 0
+    assert evaluate(codes("As,Ks,Qs,Js,Ts,9s,8s,7s")) == 0
+    hand = Hand.get("Ah,Ac,3d,4s,5s,Kh,Kd")
+    assert evaluate(hand) == evaluate(hand.cards) == hand.strength
+    assert hand.rank == Hand.Ranks.TWO_PAIR
+
+
+def test_evaluate7_matches_brute_force() -> None:
+    """tests the seven card evaluator against the best of every five card subset"""
+    random.seed(2)
+    for size in (5, 6, 7):
+        for _ in range(1000):
+            hand = random.sample(range(52), size)
+            best = max(evaluate5(*x) for x in itertools.combinations(hand, 5))
+            assert evaluate7(hand) == best
+            assert evaluate_many([hand]) == [best]
+
+
+def test_evaluate_all() -> None:
+    """tests evaluating every hand dealt from a small deck, across processes"""
+    deck = [code for code in range(52) if code % 13 in (0, 9, 10, 11, 12)]
+    counts = evaluate_all(7, deck, workers=2)
+    assert sum(counts.values()) == 77520
+    assert counts == evaluate_all(7, deck, workers=1)
+    assert counts[ROYAL_FLUSH] > 0
+
+
+def test_evaluate_array() -> None:
+    """tests evaluating flat buffers and rows of card codes"""
+    random.seed(3)
+    for width in (5, 6, 7):
+        rows = [random.sample(range(52), width) for _ in range(500)]
+        flat = array("B", itertools.chain.from_iterable(rows))
+        categories, strengths = evaluate_array(flat, width)
+        assert list(strengths) == evaluate_many(rows)
+        assert list(categories) == [category(x) for x in strengths]
+        assert evaluate_array(rows) == (categories, strengths)
+        assert evaluate_array(bytes(flat), width) == (categories, strengths)
+    assert evaluate_array([]) == (array("B"), array("I"))
+    mixed = [codes("As,As,3d,4s,5s"), codes("Ah,2c,3d,4s,5s"), codes("As,Ks,Ks,Js,Ts")]
+    assert list(evaluate_array(mixed)[1]) == [0, evaluate(mixed[1]), 0]
+    assert list(evaluate_array(bytes(codes("As,Ks,Qs,Js,Js,2c")), 6)[0]) == [0]
+    with pytest.raises(InvalidHand):
+        evaluate_array(bytes(range(8)), 4)
+    with pytest.raises(InvalidHand):
+        evaluate_array(bytes(range(8)), 5)
+
+
+def test_card_codes() -> None:
+    """tests converting between cards and arrays of card codes"""
+    hand = Hand.get("as,kh,2c,td,7s")
+    codes = cards_to_codes(hand.cards)
+    assert codes == array("B", [x.code for x in hand.cards])
+    assert codes_to_cards(codes) == hand.cards
+    assert codes_to_cards(bytes(range(52))) == list(CARDS)
+    assert evaluate_array(codes, 5)[1][0] == hand.strength
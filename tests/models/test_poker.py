@@ -0,0 +1,223 @@
+"""
+tests for the poker submodule of gamble
+"""
+
+from pathlib import Path
+from typing import Any
+import pytest
+from gamble import Card, Hand
+from gamble.errors import InvalidHand, InvalidRange
+from gamble.models.poker import (
+    EquityCache,
+    canonicalize,
+    chen,
+    class_combos,
+    class_equity,
+    equity,
+    parse_cards,
+    parse_range,
+    preflop_classes,
+    preflop_matrix,
+    range_equity,
+    top_classes,
+)
+
+
+def test_parse_cards() -> None:
+    """tests the card formats accepted by the equity api"""
+    codes = [Card.get("as").code, Card.get("kh").code]
+    assert parse_cards("AsKh") == codes
+    assert parse_cards("as, kh") == codes
+    assert parse_cards([Card.get("as"), Card.get("kh")]) == codes
+    assert parse_cards(Hand.get("as,kh")) == codes
+    assert parse_cards(codes) == codes
+
+
+def test_exact_equity() -> None:
+    """tests enumerating every runout"""
+    result = equity(["AsKs", "QdQc"], board="2s7sJh", workers=1)
+    assert result.exact
+    assert result.trials == 990
+    assert sum(result.equity) == pytest.approx(1.0)
+    assert result.equity[0] == pytest.approx(result.win[0] + result.tie[0] / 2)
+    assert result.stderr == [0.0, 0.0]
+    assert equity(["AsKs", "QdQc"], board="2s7sJh", workers=2) == result
+
+    river = equity(["AsKs", "QdQc"], board="2s7s8sJh3d", workers=1)
+    assert river.trials == 1
+    assert river.win == [1.0, 0.0]
+
+    chop = equity(["2c3c", "2d3d"], board="AsKsQsJsTs", workers=1)
+    assert chop.tie == [1.0, 1.0]
+    assert chop.equity == [0.5, 0.5]
+
+    dead = equity(["AsKs", "QdQc"], board="2s7sJh", dead="3s4s5s", workers=1)
+    assert dead.trials == 861
+    assert dead.equity[0] < result.equity[0]
+
+
+def test_monte_carlo_equity() -> None:
+    """tests sampling runouts until the confidence interval is tight"""
+    result = equity(["AsAh", "KdKc"], seed=1, workers=1)
+    assert not result.exact
+    assert result.equity[0] == pytest.approx(0.82, abs=0.01)
+    assert max(result.stderr) * 1.96 <= 0.005
+    assert equity(["AsAh", "KdKc"], seed=1, workers=1) == result
+
+    capped = equity(["AsAh", "KdKc", "7c2d"], max_trials=2000, batch_size=500, seed=2, workers=2)
+    assert capped.trials == 2000
+    assert sum(capped.equity) == pytest.approx(1.0)
+
+
+def test_invalid_equity() -> None:
+    """tests the deals that can't be calculated"""
+    with pytest.raises(InvalidHand):
+        equity(["AsKs"])
+    with pytest.raises(InvalidHand):
+        equity(["AsKs", "AsQd"])
+    with pytest.raises(InvalidHand):
+        equity(["AsKs", "QdQc"], board="2s3s4s5s6s7s")
+
+
+def test_canonicalize() -> None:
+    """tests that deals equal up to suit relabeling share a canonical form"""
+    assert canonicalize(["AsKs", "QdQc"]) == canonicalize(["AhKh", "QsQc"])
+    assert canonicalize(["AsKs", "QdQc"]) == canonicalize(["KdAd", "QcQh"])
+    assert canonicalize(["AsKs", "QdQc"]) != canonicalize(["AsKs", "QsQc"])
+    assert canonicalize(["AsKs", "QdQc"]) != canonicalize(["QdQc", "AsKs"])
+    assert canonicalize(["AsKs", "QdQc"], "2s7sJh") == canonicalize(["AhKh", "QcQd"], "Js7h2h")
+    assert canonicalize(["AsKs", "QdQc"], "2s7sJh") != canonicalize(["AsKs", "QdQc"], "2s7dJh")
+
+
+def test_equity_cache(tmp_path: Path) -> None:
+    """tests caching equities in memory and on disk"""
+    path = str(tmp_path / "equity.db")
+    cache = EquityCache(path, size=1)
+    result = cache.equity(["AsKs", "QdQc"], "2s7sJh", workers=1)
+    cached = cache.equity(["AhKh", "QsQc"], "2h7hJd", workers=1)
+    assert cached == result
+    assert cached is not result
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.equity(["AsKs", "QdQc"], "2s7sJd", workers=1)
+    assert cache.equity(["AhKh", "QsQc"], "2h7hJd") == result
+    assert cache.hits == 2
+    cache.close()
+
+    reopened = EquityCache(path)
+    assert reopened.equity(["AdKd", "QhQs"], "Jc2d7d") == result
+    assert (reopened.hits, reopened.misses) == (1, 0)
+    reopened.close()
+
+    sampled = EquityCache()
+    rough: dict[str, Any] = {
+        "exhaustive_limit": 0,
+        "max_trials": 1000,
+        "batch_size": 1000,
+        "seed": 1,
+    }
+    estimate = sampled.equity(["AsKs", "QdQc"], workers=1, **rough)
+    assert not estimate.exact
+    assert sampled.equity(["AhKh", "QsQc"], workers=1, **rough) == estimate
+    estimate.wins[0] += 1000
+    assert sampled.equity(["AsKs", "QdQc"], workers=1, **rough).wins != estimate.wins
+    finer = sampled.equity(["AsKs", "QdQc"], workers=1, **{**rough, "max_trials": 4000})
+    assert finer.trials > 1000
+    assert (sampled.hits, sampled.misses) == (2, 2)
+    assert sampled.equity(["AsKs", "QdQc"], "2s7sJh", workers=1, **rough).exact is False
+    assert sampled.equity(["AsKs", "QdQc"], "2s7sJh", workers=1).exact
+
+
+def test_preflop_classes() -> None:
+    """tests the 169 preflop classes and their combos"""
+    classes = preflop_classes()
+    assert len(classes) == 169
+    assert classes[0] == "AA"
+    assert {"AKs", "AKo", "72o"} <= set(classes)
+    assert sum(len(class_combos(x)) for x in classes) == 1326
+    assert len(class_combos("QQ")) == 6
+    assert len(class_combos("AKs")) == 4
+    assert len(class_combos("AKo")) == 12
+
+
+def test_class_equity() -> None:
+    """tests preflop class equities, calculated once per canonical matchup"""
+    cache = EquityCache()
+    aces = class_equity("AA", "KK", cache, seed=1, workers=1)
+    assert aces == pytest.approx(0.82, abs=0.01)
+    assert cache.misses == 3
+    assert cache.hits == 33
+    matrix = preflop_matrix(["AA", "KK"], cache, seed=1, workers=1)
+    assert matrix["AA", "KK"] == aces
+    assert matrix["KK", "AA"] == pytest.approx(1 - aces)
+    assert matrix["AA", "AA"] == pytest.approx(0.5, abs=0.01)
+
+
+def test_parse_range() -> None:
+    """tests the hand range notation"""
+    assert len(parse_range("QQ+")) == 18
+    assert len(parse_range("QQ+, AKs")) == 22
+    assert len(parse_range("AK")) == 16
+    assert len(parse_range("A2s+")) == 48
+    assert len(parse_range("22-55")) == 24
+    assert len(parse_range("KTo-KQo")) == 36
+    assert parse_range("KsAs") == [((Card.get("as"), Card.get("ks")), 1.0)]
+    assert {w for _, w in parse_range("AKs:0.5")} == {0.5}
+    assert parse_range("AhAd") == parse_range("AdAh")
+    assert len(parse_range("AA, AhAd:0.5")) == 6
+    assert sorted(w for _, w in parse_range("AA, AhAd:0.5")) == [0.5, 1, 1, 1, 1, 1]
+    assert len(parse_range("AK, AKo:0")) == 4
+    assert len(parse_range("AA", dead="As")) == 3
+    assert len(parse_range("AA, KK", dead="AsKs")) == 6
+    with pytest.raises(InvalidRange):
+        parse_range("AX")
+    with pytest.raises(InvalidRange):
+        parse_range("AKs:lots")
+    with pytest.raises(InvalidRange):
+        parse_range("AsAs")
+
+
+def test_top_range() -> None:
+    """tests ranking preflop classes with the chen formula"""
+    assert chen("AA") == 20
+    assert chen("AKs") == 12
+    assert chen("22") == 5
+    assert chen("72o") == -1
+    assert top_classes(1)[:2] == ["AA", "KK"]
+    assert len(parse_range("top 100%")) == 1326
+    assert 0.15 <= len(parse_range("top 15%")) / 1326 < 0.17
+
+
+def test_range_equity() -> None:
+    """tests range vs range equity against every combo matchup"""
+    hero, villain = "QQ+, AKs, T9s:0.5", "JJ-99, AQ, KQs"
+    result = range_equity(hero, villain, board="2s7sJh3d", workers=1)
+    assert result.exact
+    assert result.boards == 48
+    total = weights = 0.0
+    for first, first_weight in parse_range(hero, "2s7sJh3d"):
+        for second, second_weight in parse_range(villain, "2s7sJh3d"):
+            if set(first) & set(second):
+                continue
+            matchup = equity([first, second], board="2s7sJh3d", workers=1)
+            total += first_weight * second_weight * matchup.equity[0]
+            weights += first_weight * second_weight
+    assert result.equity == pytest.approx(total / weights)
+    assert range_equity(hero, villain, board="2s7sJh3d", workers=2) == result
+    aces = result.combo_equity[Card.get("as"), Card.get("ah")]
+    assert aces > result.equity > result.combo_equity[Card.get("ts"), Card.get("9s")]
+
+    # the hero combo is also in the villain range, typed in the other card order
+    river = "2s7sJh3d9c"
+    for pair in ("AhAd", "AdAh"):
+        matchups = [
+            equity([parse_cards(pair), combo], board=river, workers=1).equity[0]
+            for combo, _ in parse_range("AA, KK", f"{pair}{river}")
+        ]
+        expected = sum(matchups) / len(matchups)
+        assert range_equity(pair, "AA, KK", board=river).equity == pytest.approx(expected)
+
+    preflop = range_equity("top 15%", "top 30%", boards=100, seed=1, workers=1)
+    assert not preflop.exact
+    assert preflop.boards == 100
+    assert 0.5 < preflop.equity < 0.65
+    assert range_equity("top 15%", "top 30%", boards=100, seed=1, workers=2).boards == 100
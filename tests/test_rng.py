@@ -0,0 +1,60 @@
+"""
+tests for the rng submodule of gamble
+"""
+
+import random
+from gamble import Deck, Dice, Die
+from gamble.rng import GlobalRandom, SeedSequence, default_rng, spawn
+
+
+def test_default_rng() -> None:
+    """tests that dice default to the global random state"""
+    assert Die().rng is default_rng()
+    assert Deck().rng is default_rng()
+
+    random.seed(1)
+    first = Dice("4d6").roll_many(10)
+    random.seed(1)
+    assert Dice("4d6").roll_many(10) == first
+
+    rng = default_rng()
+    assert isinstance(rng, GlobalRandom)
+    rng.seed(2)
+    first = [rng.randint(1, 6) for _ in range(10)]
+    random.seed(2)
+    assert [random.randint(1, 6) for _ in range(10)] == first
+    state = random.getstate()
+    assert rng.getstate() == state
+    deck = Deck(rng=rng)
+    rng.setstate(state)
+    assert Deck(rng=rng).cards == deck.cards
+
+
+def test_seed_sequence() -> None:
+    """tests spawning independent child streams from one root seed"""
+    root = SeedSequence(1234)
+    children = root.spawn(4)
+    assert [x.spawn_key for x in children] == [(0,), (1,), (2,), (3,)]
+    assert root.spawn(1)[0].spawn_key == (4,)
+    assert len({x.state for x in children}) == 4
+    assert children[0].spawn(1)[0].spawn_key == (0, 0)
+    assert str(root) == "<SeedSequence(1234, ())>"
+    assert SeedSequence().entropy != SeedSequence().entropy
+
+    streams = [Dice("8d6+3", rng=x).roll_many(100) for x in spawn(1234, 4)]
+    assert streams == [Dice("8d6+3", rng=x).roll_many(100) for x in spawn(1234, 4)]
+    assert streams[0] != streams[1]
+
+
+def test_instance_rng() -> None:
+    """tests that dice and decks draw from their own generators"""
+    dice = Dice("d20r1+4d6kh3", 50, rng=random.Random(7))
+    assert all(die.rng is dice.rng for die in dice.dice)
+    rolls = dice.roll_many(50, batch=True)
+    assert rolls == Dice("d20r1+4d6kh3", 50, rng=random.Random(7)).roll_many(50, batch=True)
+
+    alias = Dice("10d6", alias=True, rng=random.Random(7))
+    assert alias.roll_many(20) == Dice("10d6", alias=True, rng=random.Random(7)).roll_many(20)
+
+    deck = Deck(rng=random.Random(7))
+    assert deck.cards == Deck(rng=random.Random(7)).cards
@@ -0,0 +1,102 @@
+"""
+tests for the service submodule of gamble
+"""
+
+import asyncio
+import random
+import pytest
+from gamble import Dice
+from gamble.errors import GambleException
+from gamble.service import RollService
+
+
+def test_roll_service() -> None:
+    """tests that concurrent requests are coalesced into one batch"""
+    service = RollService(window=0.01, rng=random.Random(1))
+
+    async def run() -> list[int]:
+        return await asyncio.gather(
+            *[service.roll("8d6+3") for _ in range(100)], *[service.roll("d20") for _ in range(10)]
+        )
+
+    rolls = asyncio.run(run())
+    assert all(11 <= x <= 51 for x in rolls[:100])
+    assert all(1 <= x <= 20 for x in rolls[100:])
+    assert service.requests == service.rolls == 110
+    assert service.batches == 2
+    assert service.mean_batch_size == 55
+    assert service.dice["8d6+3"].rolls == 100
+    assert 0 < service.mean_latency <= service.max_latency
+    assert service.throughput > 0
+    assert str(service) == "<RollService requests=110 batches=2>"
+
+
+def test_roll_service_max_batch() -> None:
+    """tests that full batches are rolled right away"""
+    service = RollService(window=10, max_batch=10, alias=True)
+
+    async def run() -> list[int]:
+        return await asyncio.gather(*[service.roll("100d6") for _ in range(50)])
+
+    rolls = asyncio.run(run())
+    assert len(rolls) == 50
+    assert service.batches == 5
+    assert not service._timers
+    assert RollService().mean_latency == RollService().mean_batch_size == 0.0
+    assert RollService().throughput == 0.0
+
+
+def test_roll_service_normalized() -> None:
+    """tests that equivalent expressions share a batch, and that the dice cache is bounded"""
+    service = RollService(window=0.01, cache_size=2)
+
+    async def run() -> list[int]:
+        return await asyncio.gather(*[service.roll(x) for x in ("1+2d6", "2d6+1", " 2D6 + 1 ")])
+
+    rolls = asyncio.run(run())
+    assert all(3 <= x <= 13 for x in rolls)
+    assert service.batches == 1
+    assert list(service.dice) == ["2d6+1"]
+    assert service.dice["2d6+1"].rolls == 3
+
+    for d_string in ("d4", "d8", "d4", "d10"):
+        asyncio.run(service.roll(d_string))
+    assert list(service.dice) == ["1d4", "1d10"]
+
+
+def test_roll_service_errors() -> None:
+    """tests that a bad expression fails each request right away, without opening a batch"""
+    service = RollService()
+
+    async def run() -> None:
+        first = asyncio.ensure_future(service.roll("2d6kh3"))
+        second = asyncio.ensure_future(service.roll("2d6kh3"))
+        await asyncio.sleep(0)
+        service.flush_all()
+        for task in (first, second):
+            with pytest.raises(GambleException):
+                await task
+
+    asyncio.run(run())
+    assert service.batches == service.requests == 0
+    assert not service._pending
+
+
+def test_roll_service_batch_errors(monkeypatch: pytest.MonkeyPatch) -> None:
+    """tests that a batch that fails to roll fails every request in it"""
+    service = RollService(window=0.01)
+
+    def broken(*_: object) -> list[int]:
+        """helper that fails to roll"""
+        raise GambleException("the dice fell off the table")
+
+    monkeypatch.setattr(Dice, "roll_batch", broken)
+
+    async def run() -> list[int | BaseException]:
+        return await asyncio.gather(
+            *[service.roll("2d6") for _ in range(3)], return_exceptions=True
+        )
+
+    assert all(isinstance(x, GambleException) for x in asyncio.run(run()))
+    assert service.batches == 0
+    assert not service._pending
@@ -0,0 +1,48 @@
+"""
+tests for the simulation submodule of gamble
+"""
+
+import pytest
+from gamble import Dice
+from gamble.errors import GambleException
+from gamble.simulation import SimulationResult, simulate
+
+
+def test_simulate() -> None:
+    """tests a single process dice simulation"""
+    result = simulate("d20", 20000, num_rolls=2, mode="max", seed=42, workers=1, shards=4)
+    assert result.trials == 20000
+    assert 1 <= result.min <= result.max <= 20
+    assert result.mean == pytest.approx(13.825, abs=0.2)
+    assert result.at_least(20) == pytest.approx(39 / 400, abs=0.02)
+    assert result.pmf(1) == pytest.approx(1 / 400, abs=0.005)
+    assert result.stddev == pytest.approx(result.variance**0.5)
+    assert str(result).startswith("<SimulationResult[20000]")
+
+    again = simulate("d20", 20000, num_rolls=2, mode="max", seed=42, workers=1, shards=4)
+    assert again.histogram == result.histogram
+
+    low = simulate("4d6kh3", 1000, num_rolls=3, mode="min", seed=1, workers=1)
+    assert low.max <= 18
+
+    total = simulate("2d6", 1000, mode="sum", seed=1, workers=1)
+    assert total.mean == pytest.approx(Dice("2d6").distribution().mean, abs=0.3)
+
+
+def test_simulate_processes() -> None:
+    """tests that a multi process simulation matches the single process run"""
+    single = simulate("8d6+3", 4000, seed=7, workers=1, shards=3)
+    multi = simulate("8d6+3", 4000, seed=7, workers=2, shards=3)
+    assert single.histogram == multi.histogram
+    assert single.mean == multi.mean
+
+
+def test_simulate_errors() -> None:
+    """tests invalid simulation settings"""
+    with pytest.raises(GambleException):
+        simulate("d20", 10, mode="median")
+
+    with pytest.raises(GambleException):
+        simulate("d20", 0)
+
+    assert SimulationResult().merge(SimulationResult()).trials == 0
@@ -0,0 +1,75 @@
+"""
+tests for the stats submodule of gamble
+"""
+
+import statistics
+import pytest
+from gamble import Dice
+from gamble.errors import GambleException
+from gamble.stats import RollStats
+
+
+def test_roll_stats() -> None:
+    """tests the online roll accumulator"""
+    values = [3, 1, 4, 1, 5, 9, 2, 6, 5, 3, 5]
+    stats = RollStats(1, 9)
+    for value in values[:5]:
+        stats.update(value)
+    stats.update_many(values[5:])
+    stats.update_many([])
+    assert stats.count == len(values)
+    assert stats.mean == pytest.approx(statistics.fmean(values))
+    assert stats.variance == pytest.approx(statistics.pvariance(values))
+    assert stats.sample_variance == pytest.approx(statistics.variance(values))
+    assert stats.stddev == pytest.approx(statistics.pstdev(values))
+    assert stats.frequency(5) == 3
+    assert stats.frequency(7) == 0
+    assert stats.frequency(10) == 0
+    assert str(stats).startswith("<RollStats[11]")
+
+    empty = RollStats(1, 9)
+    assert empty.variance == 0.0
+    assert empty.sample_variance == 0.0
+
+    with pytest.raises(GambleException):
+        stats.update(10)
+
+    with pytest.raises(GambleException):
+        RollStats(2, 1)
+
+
+def test_roll_stats_merge() -> None:
+    """tests merging accumulators from different workers"""
+    first, second = RollStats(2, 12), RollStats(2, 12)
+    first.update_many([2, 7, 7, 12])
+    second.update_many([6, 8])
+    merged = RollStats(2, 12).merge(first).merge(second).merge(RollStats(2, 12))
+    assert merged.count == 6
+    assert merged.mean == pytest.approx(statistics.fmean([2, 7, 7, 12, 6, 8]))
+    assert merged.variance == pytest.approx(statistics.pvariance([2, 7, 7, 12, 6, 8]))
+    assert merged.frequency(7) == 2
+
+    with pytest.raises(GambleException):
+        first.merge(RollStats(1, 6))
+
+
+def test_dice_stats() -> None:
+    """tests tracking stats on dice and dies"""
+    dice = Dice("2d6")
+    stats = dice.track_stats()
+    die_stats = dice.dice[0].track_stats()
+    dice.roll()
+    dice.roll_many(5000, batch=True)
+    assert stats.count == dice.rolls == 5001
+    assert die_stats.count == 2 * 5001
+    assert stats.mean == pytest.approx(7, abs=0.2)
+    assert stats.chi_square(dice.distribution()) < 40
+    assert RollStats(2, 12).merge(stats).count == 5001
+
+    rigged = Dice("d2", 100)
+    rigged_stats = rigged.track_stats()
+    rigged.roll_many(100)
+    rigged.dice[0].track_stats()
+    rigged.roll_many(100, batch=True)
+    assert rigged_stats.low == 0
+    assert rigged_stats.count == 200